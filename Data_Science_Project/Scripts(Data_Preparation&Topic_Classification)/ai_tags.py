@@ -0,0 +1,229 @@
+"""Paper x keyword incidence matrix of the AI keywords.
+
+ai_trends.py tags every paper of topic_clustered with the AI keywords it
+mentions and writes ai_tags/:
+
+    matrix.npz      scipy sparse CSC bool, papers x keywords
+    paper_year.npy  int16 publication year of each paper, -1 if unknown
+    paper_topic.npy int16 topic number of each paper, -1 if unknown
+    meta.json       keywords, the method each keyword counts for, topic names
+
+so any combination of methods, years and topics can be counted from
+column slices and bincounts without touching the text again:
+
+    tags = KeywordTags.load()
+    by_year, by_topic = tags.counts(["lstm", "transformer"], years=(2019, 2023))
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TAG_DIR = PROJECT_ROOT / "ai_tags"
+
+
+def sparse_nonzero(a: np.ndarray) -> np.ndarray:
+    """np.flatnonzero of a mostly-zero uint8 array, testing 8 bytes at a time."""
+    n8 = len(a) // 8 * 8
+    words = np.flatnonzero(a[:n8].view(np.uint64))
+    rows, cols = np.nonzero(a[:n8].reshape(-1, 8)[words])
+    return np.concatenate([words[rows] * 8 + cols, np.flatnonzero(a[n8:]) + n8])
+
+
+def keyword_matrix(texts, keywords, chunk_size: int = 1 << 24) -> sparse.csr_matrix:
+    """Boolean papers x keywords matrix: keyword j occurs in text i.
+
+    Same substring matching as searching each keyword separately, but all
+    keywords are found in one vectorized pass over the UTF-8 bytes of the
+    joined texts: every keyword is anchored on its rarest byte pair, a
+    lookup table marks the positions holding any anchor, and only those
+    candidates are compared against the full keyword. The scan looks up
+    every byte pair once, O(N) for N bytes of text whatever the number of
+    keywords; checking keyword k then costs O(c_k * len(k)), c_k being the
+    occurrences of its anchor, which the rarest-pair choice keeps small.
+    One str.contains per keyword would instead cost O(N) per keyword.
+
+    NUL separates the texts, so NUL characters inside a text are dropped."""
+    keywords = [k.encode("utf-8") for k in keywords]
+    if any(len(k) < 2 or b"\x00" in k for k in keywords):
+        raise ValueError("keywords need two or more characters and no NUL")
+    texts = [str(t).replace("\x00", "") for t in texts]
+    n_texts = len(texts)
+    data = "\x00".join(texts).encode("utf-8")
+    if not keywords or len(data) < 2:
+        return sparse.csr_matrix((n_texts, len(keywords)), dtype=bool)
+    buf = np.frombuffer(data, dtype=np.uint8)
+
+    # byte pair at every position, as two zero-copy little-endian uint16
+    # views: pairs at even and at odd offsets
+    halves = [np.frombuffer(data, dtype="<u2", count=(len(data) - first) // 2, offset=first)
+              for first in (0, 1)]
+
+    # anchor each keyword on the byte pair that is rarest in a sample of the text
+    sample = halves[0][:chunk_size]
+    freq = np.bincount(sample, minlength=1 << 16)
+    anchors = []
+    for k in keywords:
+        values = [k[i] | k[i + 1] << 8 for i in range(len(k) - 1)]
+        offset = int(np.argmin(freq[values]))
+        anchors.append((values[offset], offset))
+    anchor_values = sorted({value for value, _ in anchors})
+    lookup = np.zeros(1 << 16, dtype=np.uint8)
+    lookup[anchor_values] = np.arange(1, len(anchor_values) + 1)
+
+    hits = [[] for _ in anchor_values]
+    for first, half in enumerate(halves):
+        for start in range(0, len(half), chunk_size):
+            ids = lookup[half[start:start + chunk_size]]
+            positions = sparse_nonzero(ids)
+            ids = ids[positions]
+            positions = 2 * (positions + start) + first
+            for a in range(len(anchor_values)):
+                hits[a].append(positions[ids == a + 1])
+    hits = [np.concatenate(h) if h else np.array([], dtype=np.int64) for h in hits]
+
+    separators = sparse_nonzero((buf == 0).view(np.uint8))
+    rows, cols = [], []
+    for j, (k, (value, offset)) in enumerate(zip(keywords, anchors)):
+        starts = hits[anchor_values.index(value)] - offset
+        starts = starts[(starts >= 0) & (starts + len(k) <= len(buf))]
+        for i, byte in enumerate(k):
+            starts = starts[buf[starts + i] == byte]
+        found = np.unique(np.searchsorted(separators, starts))
+        rows.append(found)
+        cols.append(np.full(len(found), j))
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=bool), (rows, cols)),
+        shape=(n_texts, len(keywords)),
+    )
+
+
+def method_names(keywords):
+    """Reporting name of each keyword; "cnn " and " cnn" are both "cnn"."""
+    return [k.strip() for k in keywords]
+
+
+def method_matrix(matrix, keywords):
+    """Papers x methods boolean DataFrame, a method matching if any of its keywords does."""
+    names = pd.Index(method_names(keywords))
+    methods = names.unique()
+    to_method = sparse.csr_matrix(
+        (np.ones(len(names)), (np.arange(len(names)), methods.get_indexer(names))),
+        shape=(len(names), len(methods)),
+    )
+    return pd.DataFrame((matrix @ to_method).toarray() > 0, columns=methods)
+
+
+def save_tags(matrix, keywords, years, topic_names, out_dir: Path = TAG_DIR) -> Path:
+    """Persist a keyword_matrix() result with each paper's year and topic name."""
+    topics = pd.Categorical(topic_names)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sparse.save_npz(out_dir / "matrix.npz", sparse.csc_matrix(matrix, dtype=bool))
+    np.save(out_dir / "paper_year.npy",
+            pd.to_numeric(pd.Series(years), errors="coerce").fillna(-1).to_numpy(np.int16))
+    np.save(out_dir / "paper_topic.npy", topics.codes.astype(np.int16))
+    meta = {"keywords": list(keywords), "methods": method_names(keywords),
+            "topics": [str(t) for t in topics.categories]}
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return out_dir
+
+
+class KeywordTags:
+    """Counts of papers mentioning chosen AI methods, by year and topic."""
+
+    def __init__(self, matrix, years, topics, meta: dict):
+        self.matrix = sparse.csc_matrix(matrix)
+        self.years = np.asarray(years)
+        self.topics = np.asarray(topics)
+        self.keywords = meta["keywords"]
+        self.keyword_methods = meta["methods"]
+        self.topic_names = meta["topics"]
+        self.year_values = np.unique(self.years[self.years >= 0])
+        # position of each paper's year in year_values, -1 if unknown
+        self._year_pos = np.where(self.years >= 0, np.searchsorted(self.year_values, self.years), -1)
+
+    @classmethod
+    def load(cls, tag_dir: Path = TAG_DIR):
+        tag_dir = Path(tag_dir)
+        with open(tag_dir / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(
+            sparse.load_npz(tag_dir / "matrix.npz"),
+            np.load(tag_dir / "paper_year.npy"),
+            np.load(tag_dir / "paper_topic.npy"),
+            meta,
+        )
+
+    @property
+    def n_papers(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def methods(self) -> list:
+        return list(dict.fromkeys(self.keyword_methods))
+
+    def matches(self, methods=None) -> np.ndarray:
+        """Boolean array: the paper mentions any keyword of `methods` (all if None)."""
+        methods = set(self.methods if methods is None else methods)
+        cols = [j for j, m in enumerate(self.keyword_methods) if m in methods]
+        out = np.zeros(self.n_papers, dtype=bool)
+        for j in cols:
+            out[self.matrix.indices[self.matrix.indptr[j]:self.matrix.indptr[j + 1]]] = True
+        return out
+
+    def select(self, years=None, topics=None) -> np.ndarray:
+        """Boolean array of papers in the (first, last) year range and topic names.
+
+        Papers of unknown year are only left out when a year range is given."""
+        mask = np.ones(self.n_papers, dtype=bool)
+        if years is not None:
+            mask &= (self.years >= years[0]) & (self.years <= years[1])
+        if topics is not None:
+            codes = [i for i, t in enumerate(self.topic_names) if t in set(topics)]
+            mask &= np.isin(self.topics, codes)
+        return mask
+
+    def _by_year(self, flags, mask):
+        n = len(self.year_values)
+        return np.bincount(self._year_pos[mask & flags & (self._year_pos >= 0)], minlength=n)
+
+    def counts(self, methods=None, years=None, topics=None):
+        """(by_year, by_topic) DataFrames of ai_papers, total_papers and ai_ratio
+        among the selected papers, like ai_trends_year/topic.csv."""
+        mask = self.select(years, topics)
+        hit = self.matches(methods)
+
+        by_year = pd.DataFrame({
+            "year": self.year_values,
+            "ai_papers": self._by_year(hit, mask),
+            "total_papers": self._by_year(True, mask),
+        })
+        by_year = by_year[by_year["total_papers"] > 0].reset_index(drop=True)
+        by_year["ai_ratio"] = by_year["ai_papers"] / by_year["total_papers"]
+
+        known = mask & (self.topics >= 0)
+        n = len(self.topic_names)
+        by_topic = pd.DataFrame({
+            "topic_name": self.topic_names,
+            "ai_papers": np.bincount(self.topics[known & hit], minlength=n),
+            "total_papers": np.bincount(self.topics[known], minlength=n),
+        })
+        by_topic = by_topic[by_topic["total_papers"] > 0].reset_index(drop=True)
+        by_topic["ai_ratio"] = by_topic["ai_papers"] / by_topic["total_papers"]
+        return by_year, by_topic
+
+    def method_counts(self, methods=None, years=None, topics=None) -> pd.DataFrame:
+        """Selected papers mentioning each method, one row per year."""
+        mask = self.select(years, topics)
+        methods = self.methods if methods is None else list(methods)
+        table = pd.DataFrame(
+            {m: self._by_year(self.matches([m]), mask) for m in methods},
+            index=pd.Index(self.year_values, name="year"),
+        )
+        return table.loc[self._by_year(True, mask) > 0]
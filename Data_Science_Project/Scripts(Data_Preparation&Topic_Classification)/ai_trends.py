@@ -1,13 +1,16 @@
 from pathlib import Path
-import re
 
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 
+from ai_tags import TAG_DIR, keyword_matrix, method_matrix, save_tags
+from table_io import read_table
+from topic_model import load_topic_names
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CSV_PATH = PROJECT_ROOT / "topic_clustered.csv"
 
-df = pd.read_csv(CSV_PATH)
+df = read_table(CSV_PATH, columns=["eid", "year", "title", "abstract", "cluster"])
 
 df["year"] = df["year"].astype(str)
 
@@ -38,12 +41,9 @@ ai_keywords = [
     "data mining"
 ]
 
-patterns = [re.compile(re.escape(k)) for k in ai_keywords]
-
-def is_ai(text):
-    return any(p.search(text) for p in patterns)
-
-df["is_ai"] = df["text"].apply(is_ai)
+matches = keyword_matrix(df["text"], ai_keywords)
+df["is_ai"] = np.diff(matches.indptr) > 0
+methods = method_matrix(matches, ai_keywords).set_index(df.index)
 
 ai_by_year = (
     df.groupby("year")["is_ai"]
@@ -55,18 +55,7 @@ ai_by_year["ai_ratio"] = ai_by_year["ai_papers"] / ai_by_year["total_papers"]
 print("AI papers per year:")
 print(ai_by_year)
 
-topic_names = {
-    0: "Biodiversity & Species Discovery",
-    1: "Catalysis & CO2 Conversion",
-    2: "Education & Social/Public Health",
-    3: "Materials Science & Adsorption",
-    4: "Cancer Biology & Drug Discovery",
-    5: "Biomedical Experiments & Genetics",
-    6: "Clinical Patient Studies",
-    7: "COVID-19 & Vaccine Research",
-    8: "Particle Physics (LHC)",
-    9: "Machine Learning & Modeling",
-}
+topic_names = load_topic_names()
 
 df["topic_name"] = df["cluster"].map(topic_names)
 
@@ -80,14 +69,31 @@ ai_by_topic["ai_ratio"] = ai_by_topic["ai_papers"] / ai_by_topic["total_papers"]
 print("\nAI papers by topic:")
 print(ai_by_topic.sort_values("ai_ratio", ascending=False))
 
+# papers mentioning each method, per year and per topic
+methods_by_year = methods.groupby(df["year"]).sum()
+methods_by_topic = methods.groupby(df["topic_name"]).sum()
+
+print("\nAI methods overall:")
+print(methods.sum().sort_values(ascending=False))
+
+save_tags(matches, ai_keywords, df["year"], df["topic_name"])
+
 ai_year_path = PROJECT_ROOT / "ai_trends_year.csv"
 ai_topic_path = PROJECT_ROOT / "ai_trends_topic.csv"
 
+methods_year_path = PROJECT_ROOT / "ai_methods_year.csv"
+methods_topic_path = PROJECT_ROOT / "ai_methods_topic.csv"
+
 ai_by_year.to_csv(ai_year_path, index=False)
 ai_by_topic.to_csv(ai_topic_path, index=False)
+methods_by_year.to_csv(methods_year_path)
+methods_by_topic.to_csv(methods_topic_path)
 
 print("\nSaved AI trends by year to", ai_year_path)
 print("Saved AI trends by topic to", ai_topic_path)
+print("Saved AI method counts by year to", methods_year_path)
+print("Saved AI method counts by topic to", methods_topic_path)
+print("Saved AI keyword tags to", TAG_DIR)
 
 plt.figure(figsize=(8, 5))
 plt.plot(ai_by_year["year"], ai_by_year["ai_papers"], marker="o")
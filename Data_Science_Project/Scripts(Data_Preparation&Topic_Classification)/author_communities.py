@@ -0,0 +1,168 @@
+"""Community detection over the full co-author graph.
+
+Runs weighted label propagation on the CSR store written by
+coauthor_author_network.py. Every author starts in its own community and
+repeatedly adopts the label with the largest total edge weight among its
+neighbours (keeping its own label on ties). Each round costs one pass
+over the edges, split into row ranges that worker processes read from
+the memory-mapped store. To avoid the label oscillation of fully
+synchronous updates, only a random half of the authors move per round.
+
+Communities are numbered by size, largest first, and written to:
+
+    author_communities.csv     author_id, name, community, community_size
+    author_graph/community.npy community per author_id, for AuthorGraph
+
+Usage: python author_communities.py [--workers 8] [--max-iter 30]
+"""
+import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from author_graph import GRAPH_DIR, AuthorGraph
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+COMMUNITIES_PATH = PROJECT_ROOT / "author_communities.csv"
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+_graph = None
+
+
+def _init_worker(graph_dir):
+    global _graph
+    _graph = AuthorGraph.load(graph_dir)
+
+
+def best_labels(indptr, indices, weights, labels, start, end):
+    """Label with the largest neighbour weight for rows start..end-1.
+
+    Ties go to the row's current label, then to the smallest label. Rows
+    without neighbours keep their label."""
+    lo, hi = indptr[start], indptr[end]
+    rows = np.repeat(np.arange(end - start), np.diff(indptr[start:end + 1]))
+    nbr_labels = labels[np.asarray(indices[lo:hi])]
+    current = np.asarray(labels[start:end])
+    out = current.copy()
+    if len(rows) == 0:
+        return out
+
+    key = rows.astype(np.int64) * len(labels) + nbr_labels
+    uniq, inverse = np.unique(key, return_inverse=True)
+    score = np.bincount(inverse, weights=np.asarray(weights[lo:hi], dtype=np.float64))
+    row, label = uniq // len(labels), uniq % len(labels)
+    order = np.lexsort((label, label != current[row], -score, row))
+    first = order[np.r_[True, row[order][1:] != row[order][:-1]]]
+    out[row[first]] = label[first]
+    return out
+
+
+def _chunk_labels(args):
+    labels_path, start, end = args
+    labels = np.load(labels_path, mmap_mode="r")
+    g = _graph
+    return start, best_labels(g.indptr, g.indices, g.weights, labels, start, end)
+
+
+def row_chunks(indptr, n_chunks):
+    """Split rows into ranges with about the same number of edges."""
+    n = len(indptr) - 1
+    targets = np.linspace(0, indptr[-1], n_chunks + 1)
+    bounds = np.unique(np.r_[0, np.searchsorted(indptr, targets[1:-1]), n])
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def label_propagation(g: AuthorGraph, workers=DEFAULT_WORKERS, max_iter=30, tol=1e-4,
+                      seed=42, graph_dir=GRAPH_DIR):
+    """Community label per author_id (not yet renumbered)."""
+    n = g.n_authors
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n, dtype=np.int32)
+    chunks = row_chunks(g.indptr, max(1, workers) * 4)
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(graph_dir,))
+    else:
+        _init_worker(graph_dir)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            labels_path = os.path.join(tmp, "labels.npy")
+            for it in range(1, max_iter + 1):
+                np.save(labels_path, labels)
+                tasks = [(labels_path, start, end) for start, end in chunks]
+                results = map(_chunk_labels, tasks) if executor is None \
+                    else executor.map(_chunk_labels, tasks)
+                proposed = labels.copy()
+                for start, chunk in results:
+                    proposed[start:start + len(chunk)] = chunk
+
+                changed = proposed != labels
+                if changed.sum() <= tol * n:
+                    break
+                move = changed & (rng.random(n) < 0.5)
+                labels[move] = proposed[move]
+                print(f"Iteration {it}: {int(move.sum())} authors moved")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return labels
+
+
+def renumber_by_size(labels):
+    """Renumber communities 0..c-1, largest first. Returns (ids, sizes)."""
+    uniq, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.argsort(-counts, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return rank[inverse].astype(np.int32), counts[order]
+
+
+def modularity(g: AuthorGraph, community) -> float:
+    """Weighted Newman modularity of a partition of the store's graph."""
+    rows = np.repeat(np.arange(g.n_authors), g.degrees())
+    w = np.asarray(g.weights, dtype=np.float64)
+    two_m = w.sum()
+    if two_m == 0:
+        return 0.0
+    internal = np.bincount(community[rows], weights=w * (community[rows] == community[g.indices]))
+    strength = np.bincount(community[rows], weights=w)
+    return float((internal / two_m - (strength / two_m) ** 2).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect author communities on the co-author graph.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="worker processes (1 = no multiprocessing)")
+    parser.add_argument("--max-iter", type=int, default=30, help="maximum propagation rounds")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the update order")
+    args = parser.parse_args()
+
+    g = AuthorGraph.load(GRAPH_DIR)
+    labels = label_propagation(g, workers=args.workers, max_iter=args.max_iter, seed=args.seed)
+    community, sizes = renumber_by_size(labels)
+
+    np.save(GRAPH_DIR / "community.npy", community)
+    out = pd.DataFrame({
+        "author_id": g.authors["author_id"].to_numpy(),
+        "name": g.names,
+        "community": community,
+        "community_size": sizes[community],
+    })
+    out.to_csv(COMMUNITIES_PATH, index=False)
+
+    print(f"\n{len(sizes)} communities, {int((sizes > 1).sum())} with more than one author")
+    print("Largest community sizes:", sizes[:10].tolist())
+    print(f"Modularity: {modularity(g, community):.4f}")
+    print("Saved to", COMMUNITIES_PATH)
+    print("Saved to", GRAPH_DIR / "community.npy")
+
+
+if __name__ == "__main__":
+    main()
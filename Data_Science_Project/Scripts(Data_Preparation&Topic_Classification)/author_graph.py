@@ -0,0 +1,294 @@
+"""Binary CSR store for the co-author graph, with a small query API.
+
+coauthor_author_network.py writes the store to author_graph/:
+
+    indptr.npy    int64 row pointers (n_authors + 1)
+    indices.npy   int32 neighbour author IDs, sorted within each row
+    weights.npy   edge weights (shared papers), aligned with indices
+    authors.csv   author_id, name, auid
+    meta.json     sizes and build parameters
+
+and, for queries restricted to a year range, the paper incidence:
+
+    author_papers_indptr.npy / author_papers_indices.npy   author -> papers
+    paper_authors_indptr.npy / paper_authors_indices.npy   paper -> authors
+    paper_year.npy     int16 publication year per paper_id (-1 if unknown)
+    paper_weight.npy   float32 weight each paper gives its author pairs
+                       (0 for hyper-authored papers left out of the graph)
+
+author_communities.py adds community.npy, the community of each author.
+
+The adjacency is symmetric, so each undirected edge is stored in both
+rows. The arrays are memory-mapped on load, so opening the graph costs
+only the author table; a neighbour lookup is two slices.
+
+    g = AuthorGraph.load()
+    g.neighbors(g.id_of("Smith J."))
+    g.year_subgraph_edges(g.top_k(50, years=(2020, 2023)), years=(2020, 2023))
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GRAPH_DIR = PROJECT_ROOT / "author_graph"
+
+
+def save_graph(src, dst, weight, authors: pd.DataFrame, out_dir: Path = GRAPH_DIR,
+               incidence=None, paper_year=None, paper_weight=None, **meta):
+    """Write an undirected weighted graph given as upper-triangle edges.
+
+    `authors` has one row per author_id (0..n-1) with name and auid. The
+    optional paper x author `incidence` with per-paper year and weight is
+    stored for year-range queries."""
+    n = len(authors)
+    upper = sparse.coo_matrix((weight, (src, dst)), shape=(n, n))
+    adj = (upper + upper.T).tocsr()
+    adj.sort_indices()
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "indptr.npy", adj.indptr.astype(np.int64))
+    np.save(out_dir / "indices.npy", adj.indices.astype(np.int32))
+    np.save(out_dir / "weights.npy", adj.data)
+    # communities belong to the previous graph; author_communities.py redoes them
+    (out_dir / "community.npy").unlink(missing_ok=True)
+    if incidence is not None:
+        paper_authors = sparse.csr_matrix(incidence)
+        author_papers = paper_authors.T.tocsr()
+        for name, m in [("paper_authors", paper_authors), ("author_papers", author_papers)]:
+            m.sort_indices()
+            np.save(out_dir / f"{name}_indptr.npy", m.indptr.astype(np.int64))
+            np.save(out_dir / f"{name}_indices.npy", m.indices.astype(np.int32))
+        year = pd.to_numeric(pd.Series(paper_year), errors="coerce").fillna(-1)
+        np.save(out_dir / "paper_year.npy", year.to_numpy(dtype=np.int16))
+        np.save(out_dir / "paper_weight.npy", np.asarray(paper_weight, dtype=np.float32))
+        years = year[year >= 0]
+        if len(years):
+            meta.update(min_year=int(years.min()), max_year=int(years.max()))
+    authors[["author_id", "name", "auid"]].to_csv(out_dir / "authors.csv", index=False)
+    meta = {"n_authors": n, "n_edges": int(len(weight)), **meta}
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+def top_edges_per_author(edges: pd.DataFrame, authors, per_author: int) -> pd.DataFrame:
+    """The `per_author` heaviest edges of every author, in one groupby.
+
+    `edges` has source, target and weight columns. Each edge is listed once per endpoint; ties keep the file order."""
+    edges = edges.assign(_row=np.arange(len(edges)))
+    both_ends = pd.concat(
+        [edges.assign(_author=edges["source"]), edges.assign(_author=edges["target"])],
+        ignore_index=True,
+    )
+    both_ends = both_ends[both_ends["_author"].isin(set(authors))]
+    both_ends = both_ends.sort_values(["_author", "weight", "_row"], ascending=[True, False, True])
+    top = both_ends.groupby("_author", sort=False).head(per_author)
+    return (
+        top.drop_duplicates("_row")
+        .sort_values("_row")
+        .drop(columns=["_author", "_row"])
+    )
+
+
+class AuthorGraph:
+    """Read-only co-author graph over the CSR store."""
+
+    def __init__(self, indptr, indices, weights, authors: pd.DataFrame, meta=None,
+                 papers=None, community=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.authors = authors
+        self.names = authors["name"].to_numpy()
+        self.meta = meta or {}
+        self.papers = papers
+        self.community = community
+        self._by_name = None
+
+    @classmethod
+    def load(cls, graph_dir: Path = GRAPH_DIR, mmap: bool = True):
+        graph_dir = Path(graph_dir)
+        mode = "r" if mmap else None
+        with open(graph_dir / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        papers = None
+        if (graph_dir / "paper_year.npy").exists():
+            papers = {
+                name: np.load(graph_dir / f"{name}.npy", mmap_mode=mode)
+                for name in ["author_papers_indptr", "author_papers_indices",
+                             "paper_authors_indptr", "paper_authors_indices",
+                             "paper_year", "paper_weight"]
+            }
+        community = None
+        if (graph_dir / "community.npy").exists():
+            community = np.load(graph_dir / "community.npy", mmap_mode=mode)
+        return cls(
+            np.load(graph_dir / "indptr.npy", mmap_mode=mode),
+            np.load(graph_dir / "indices.npy", mmap_mode=mode),
+            np.load(graph_dir / "weights.npy", mmap_mode=mode),
+            pd.read_csv(graph_dir / "authors.csv", dtype={"auid": str}),
+            meta,
+            papers,
+            community,
+        )
+
+    @property
+    def n_authors(self) -> int:
+        return len(self.indptr) - 1
+
+    def matrix(self) -> sparse.csr_matrix:
+        """The adjacency as a scipy CSR matrix (shares the mapped arrays)."""
+        n = self.n_authors
+        return sparse.csr_matrix((self.weights, self.indices, self.indptr), shape=(n, n))
+
+    def ids_of(self, name: str):
+        """All author IDs with this indexed name (names are not unique)."""
+        if self._by_name is None:
+            self._by_name = self.authors.groupby("name")["author_id"].apply(list).to_dict()
+        return self._by_name.get(name, [])
+
+    def id_of(self, name: str) -> int:
+        """The best-connected author ID with this name."""
+        ids = self.ids_of(name)
+        if not ids:
+            raise KeyError(name)
+        return max(ids, key=self.degree)
+
+    def neighbors(self, author_id: int):
+        """Return (neighbour IDs, edge weights) of one author."""
+        start, end = self.indptr[author_id], self.indptr[author_id + 1]
+        return np.asarray(self.indices[start:end]), np.asarray(self.weights[start:end])
+
+    def degree(self, author_id: int) -> int:
+        return int(self.indptr[author_id + 1] - self.indptr[author_id])
+
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def top_k_by_degree(self, k: int) -> np.ndarray:
+        """IDs of the k highest-degree authors, highest first."""
+        deg = self.degrees()
+        k = min(k, len(deg))
+        if k == 0:
+            return np.array([], dtype=np.int64)
+        top = np.argpartition(-deg, k - 1)[:k]
+        return top[np.argsort(-deg[top], kind="stable")]
+
+    def ego(self, author_id: int, depth: int = 1) -> np.ndarray:
+        """Sorted IDs of all authors within `depth` hops of author_id."""
+        seen = np.zeros(self.n_authors, dtype=bool)
+        seen[author_id] = True
+        frontier = np.array([author_id])
+        for _ in range(depth):
+            if len(frontier) == 0:
+                break
+            nbrs = np.concatenate([self.neighbors(a)[0] for a in frontier])
+            frontier = np.unique(nbrs[~seen[nbrs]])
+            seen[frontier] = True
+        return np.flatnonzero(seen)
+
+    def subgraph_edges(self, author_ids) -> pd.DataFrame:
+        """Edges among author_ids as a DataFrame (source, target, weight, ids)."""
+        ids = np.asarray(author_ids)
+        sub = sparse.triu(self.matrix()[ids][:, ids], k=1).tocoo()
+        return pd.DataFrame({
+            "source": self.names[ids[sub.row]],
+            "target": self.names[ids[sub.col]],
+            "weight": sub.data,
+            "source_id": ids[sub.row],
+            "target_id": ids[sub.col],
+        })
+
+    def ego_edges(self, author_id: int, depth: int = 1) -> pd.DataFrame:
+        return self.subgraph_edges(self.ego(author_id, depth))
+
+    # --- year-range queries over the paper incidence ---------------------
+
+    def has_papers(self) -> bool:
+        return self.papers is not None
+
+    def year_range(self):
+        return self.meta.get("min_year"), self.meta.get("max_year")
+
+    def _incidence(self, name: str) -> sparse.csr_matrix:
+        indptr = self.papers[f"{name}_indptr"]
+        indices = self.papers[f"{name}_indices"]
+        n_rows, n_cols = len(indptr) - 1, int(self.meta["n_papers"])
+        if name == "author_papers":
+            shape = (n_rows, n_cols)
+        else:
+            shape = (n_rows, self.n_authors)
+        return sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                                 shape=shape)
+
+    def paper_weights(self, years=None) -> np.ndarray:
+        """Per-paper pair weight, zeroed outside the (first, last) year range."""
+        w = np.asarray(self.papers["paper_weight"], dtype=np.float32)
+        if years is not None:
+            year = np.asarray(self.papers["paper_year"])
+            w = w * ((year >= years[0]) & (year <= years[1]))
+        return w
+
+    def year_degrees(self, years=None) -> np.ndarray:
+        """Co-authors per author, counting only papers in the year range.
+
+        An edge counts under the same rules as in the stored graph (papers
+        of weight 0 left out, min_weight), so over all years this equals
+        degrees()."""
+        author_papers = self._incidence("author_papers")
+        adj = (author_papers @ sparse.diags(self.paper_weights(years)) @ author_papers.T).tocsr()
+        rows = np.repeat(np.arange(self.n_authors), np.diff(adj.indptr))
+        keep = (adj.indices != rows) & (adj.data > 0) & (adj.data >= self.meta.get("min_weight", 0))
+        return np.bincount(rows[keep], minlength=self.n_authors)
+
+    def top_k(self, k: int, years=None) -> np.ndarray:
+        """IDs of the k authors with the most co-authors, highest first;
+        within the year range, only papers of those years count."""
+        if years is None or not self.has_papers():
+            return self.top_k_by_degree(k)
+        scores = self.year_degrees(years)
+        k = min(k, int((scores > 0).sum()))
+        if k == 0:
+            return np.array([], dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
+
+    def year_ego(self, author_id: int, depth: int = 1, years=None) -> np.ndarray:
+        """Sorted IDs of authors within `depth` hops of author_id, counting
+        only papers that fall in the year range."""
+        author_papers = self._incidence("author_papers")
+        paper_authors = self._incidence("paper_authors")
+        active = self.paper_weights(years) > 0
+
+        seen = np.zeros(self.n_authors, dtype=bool)
+        seen[author_id] = True
+        frontier = np.array([author_id])
+        for _ in range(depth):
+            if len(frontier) == 0:
+                break
+            papers = np.unique(author_papers[frontier].indices)
+            papers = papers[active[papers]]
+            nbrs = np.unique(paper_authors[papers].indices)
+            frontier = nbrs[~seen[nbrs]]
+            seen[frontier] = True
+        return np.flatnonzero(seen)
+
+    def year_subgraph_edges(self, author_ids, years=None) -> pd.DataFrame:
+        """Edges among author_ids, weighted by shared papers in the year range."""
+        ids = np.asarray(author_ids)
+        sub = self._incidence("author_papers")[ids]
+        shared = sparse.triu(sub @ sparse.diags(self.paper_weights(years)) @ sub.T, k=1).tocoo()
+        keep = (shared.data > 0) & (shared.data >= self.meta.get("min_weight", 0))
+        row, col = shared.row[keep], shared.col[keep]
+        return pd.DataFrame({
+            "source": self.names[ids[row]],
+            "target": self.names[ids[col]],
+            "weight": shared.data[keep],
+            "source_id": ids[row],
+            "target_id": ids[col],
+        })
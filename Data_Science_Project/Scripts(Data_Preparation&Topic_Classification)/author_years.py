@@ -0,0 +1,240 @@
+"""Per-year co-author networks on a shared author index.
+
+coauthor_author_network.py calls update_year_graphs() after every build.
+It keeps one upper-triangle author x author matrix per publication year
+in author_graph/years/:
+
+    index.csv       key, name - row/column order of every matrix; authors
+                    are keyed like link_tables (Scopus @auid, else
+                    "name:" + name) and new ones are only ever appended
+    <year>.npz      scipy sparse CSR, weight = (weighted) shared papers
+    manifest.json   content digest of each year's papers and the build
+                    parameters
+
+A year is only recomputed when its digest changes, so adding a new year
+costs one sparse product over that year's papers. Matrices written
+before the index grew are padded on load, which makes cumulative or
+windowed networks a sum of a few sparse matrices:
+
+    yg = YearGraphs.load()
+    yg.edges(yg.window(2020, 2022))
+    yg.summary()
+
+`python author_years.py --first 2019 --last 2021` writes the edges of a
+window to author_edges_2019_2021.csv.
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from author_graph import GRAPH_DIR
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+YEARS_DIR = GRAPH_DIR / "years"
+
+
+def author_keys(authors: pd.DataFrame) -> pd.Series:
+    """Stable author key per dim_authors row: the @auid, else "name:" + name."""
+    auid = pd.to_numeric(authors["auid"], errors="coerce")
+    keys = "name:" + authors["name"].astype(str)
+    known = auid.notna()
+    keys[known] = auid[known].astype("int64").astype(str)
+    return keys
+
+
+def load_index(out_dir: Path = YEARS_DIR) -> pd.DataFrame:
+    path = Path(out_dir) / "index.csv"
+    if not path.exists():
+        return pd.DataFrame({"key": pd.Series(dtype=str), "name": pd.Series(dtype=str)})
+    return pd.read_csv(path, dtype={"key": str, "name": str}, keep_default_na=False)
+
+
+def load_manifest(out_dir: Path = YEARS_DIR) -> dict:
+    path = Path(out_dir) / "manifest.json"
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def year_digest(eids, keys, weights, params: dict) -> str:
+    """Digest of one year's paper memberships, pair weights and parameters."""
+    members = pd.DataFrame({"eid": eids, "key": keys, "weight": weights})
+    members = members.sort_values(["eid", "key"], ignore_index=True)
+    h = hashlib.sha1(json.dumps(params, sort_keys=True).encode())
+    h.update(pd.util.hash_pandas_object(members, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def pair_matrix(rows, cols, paper_weight, n_papers, n_authors) -> sparse.csr_matrix:
+    """Upper triangle of P.T @ diag(w) @ P for a paper x author membership list."""
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(n_papers, n_authors))
+    weighted = sparse.diags(paper_weight, dtype=np.float64) @ incidence
+    shared = sparse.triu(incidence.T @ weighted, k=1).tocsr()
+    shared.eliminate_zeros()
+    return shared
+
+
+def update_year_graphs(incidence, paper_year, paper_weight, paper_eid, authors: pd.DataFrame,
+                       params: dict, out_dir: Path = YEARS_DIR):
+    """Bring the per-year matrices up to date with the current papers.
+
+    `incidence` is the paper x author_id matrix with one row per paper,
+    aligned with `paper_year`, `paper_weight` and `paper_eid`. Returns the
+    years that were (re)built."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    index = load_index(out_dir)
+    keys = author_keys(authors).to_numpy()
+    positions = dict(zip(index["key"], range(len(index))))
+    new = ~pd.Series(keys).isin(positions).to_numpy()
+    if new.any():
+        new_keys = pd.unique(keys[new])
+        names = pd.Series(authors["name"].to_numpy()[new], index=keys[new])
+        names = names[~names.index.duplicated()]
+        index = pd.concat([index, pd.DataFrame({"key": new_keys, "name": names[new_keys].values})],
+                          ignore_index=True)
+        positions = dict(zip(index["key"], range(len(index))))
+        index.to_csv(out_dir / "index.csv", index=False)
+    author_pos = np.array([positions[k] for k in keys], dtype=np.int64)
+
+    members = sparse.csr_matrix(incidence).tocoo()
+    year = pd.to_numeric(pd.Series(paper_year), errors="coerce").to_numpy()
+    member_year = year[members.row]
+    paper_weight = np.asarray(paper_weight, dtype=np.float64)
+    paper_eid = np.asarray(paper_eid)
+
+    manifest = load_manifest(out_dir)
+    built, current = [], set()
+    for y in np.unique(year[~np.isnan(year)]).astype(int):
+        sel = member_year == y
+        rows, cols = members.row[sel], author_pos[members.col[sel]]
+        digest = year_digest(paper_eid[rows], keys[members.col[sel]], paper_weight[rows], params)
+        path = out_dir / f"{y}.npz"
+        current.add(str(y))
+        if manifest.get(str(y), {}).get("digest") == digest and path.exists():
+            continue
+
+        papers = np.unique(rows)
+        local_rows = np.searchsorted(papers, rows)
+        m = pair_matrix(local_rows, cols, paper_weight[papers], len(papers), len(index))
+        sparse.save_npz(path, m)
+        manifest[str(y)] = {"digest": digest, "n_papers": int(len(papers)),
+                            "n_edges": int(m.nnz)}
+        built.append(int(y))
+
+    for y in set(manifest) - current:
+        (out_dir / f"{y}.npz").unlink(missing_ok=True)
+        del manifest[y]
+    with open(out_dir / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return built
+
+
+class YearGraphs:
+    """Per-year co-author matrices over the shared author index."""
+
+    def __init__(self, index: pd.DataFrame, manifest: dict, out_dir: Path = YEARS_DIR):
+        self.index = index
+        self.names = index["name"].to_numpy()
+        self.manifest = manifest
+        self.out_dir = Path(out_dir)
+        self._cache = {}
+
+    @classmethod
+    def load(cls, out_dir: Path = YEARS_DIR):
+        return cls(load_index(out_dir), load_manifest(out_dir), out_dir)
+
+    @property
+    def n_authors(self) -> int:
+        return len(self.index)
+
+    @property
+    def years(self):
+        return sorted(int(y) for y in self.manifest)
+
+    def matrix(self, year: int) -> sparse.csr_matrix:
+        """Upper-triangle weights of one year, padded to the current index."""
+        if year not in self._cache:
+            m = sparse.load_npz(self.out_dir / f"{year}.npz").tocsr()
+            m.resize((self.n_authors, self.n_authors))
+            self._cache[year] = m
+        return self._cache[year]
+
+    def window(self, first=None, last=None) -> sparse.csr_matrix:
+        """Summed weights over the years first..last (inclusive, open if None)."""
+        n = self.n_authors
+        total = sparse.csr_matrix((n, n), dtype=np.float64)
+        for y in self.years:
+            if (first is None or y >= first) and (last is None or y <= last):
+                total = total + self.matrix(y)
+        return total
+
+    def cumulative(self, last: int) -> sparse.csr_matrix:
+        """Network of all papers up to and including `last`."""
+        return self.window(None, last)
+
+    def edges(self, m: sparse.spmatrix, min_weight: float = 0) -> pd.DataFrame:
+        """Edge list (source, target, weight, source_key, target_key) of a matrix."""
+        m = m.tocoo()
+        keep = (m.data > 0) & (m.data >= min_weight)
+        row, col = m.row[keep], m.col[keep]
+        keys = self.index["key"].to_numpy()
+        return pd.DataFrame({
+            "source": self.names[row],
+            "target": self.names[col],
+            "weight": m.data[keep],
+            "source_key": keys[row],
+            "target_key": keys[col],
+        })
+
+    def summary(self) -> pd.DataFrame:
+        """Papers, edges, total weight and active authors per year."""
+        rows = []
+        for y in self.years:
+            m = self.matrix(y)
+            active = np.zeros(self.n_authors, dtype=bool)
+            coo = m.tocoo()
+            active[coo.row] = active[coo.col] = True
+            rows.append({
+                "year": y,
+                "papers": self.manifest[str(y)]["n_papers"],
+                "edges": m.nnz,
+                "total_weight": float(m.sum()),
+                "active_authors": int(active.sum()),
+            })
+        return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-year co-author networks.")
+    parser.add_argument("--first", type=int, help="first year of the window to export")
+    parser.add_argument("--last", type=int, help="last year of the window to export")
+    parser.add_argument("--min-weight", type=float, default=0,
+                        help="drop edges whose weight is below this")
+    args = parser.parse_args()
+
+    yg = YearGraphs.load()
+    if not yg.years:
+        raise SystemExit(f"No per-year graphs in {YEARS_DIR}; run coauthor_author_network.py first")
+    print(yg.summary().to_string(index=False))
+
+    if args.first is not None or args.last is not None:
+        first = args.first if args.first is not None else yg.years[0]
+        last = args.last if args.last is not None else yg.years[-1]
+        edges = yg.edges(yg.window(first, last), args.min_weight)
+        out = PROJECT_ROOT / f"author_edges_{first}_{last}.csv"
+        edges.to_csv(out, index=False)
+        print(f"\n{len(edges)} edges in {first}-{last}")
+        print("Saved to", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark the JSON decoder backends on a synthetic Scopus corpus.
+
+For every installed backend in json_decoders.py this measures records per
+second for decoding alone and for decoding plus parse_document(), and
+checks that the parsed records are identical to the stdlib ones.
+
+Usage: python bench_json_decoders.py [--docs 5000] [--repeat 3]
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+import json_decoders
+from build_papers_csv import parse_document
+
+
+def synthetic_document(i: int, rng: random.Random) -> dict:
+    """One paper shaped like an abstracts-retrieval-response, with the
+    bulky bibrecord/reference part the parsers never read."""
+    n_authors = rng.choice([1, 2, 3, 5, 8, 12, 40])
+    authors = [
+        {
+            "@auid": str(rng.randrange(10**10, 10**11)),
+            "@seq": str(k + 1),
+            "ce:indexed-name": f"Author{rng.randrange(100000)} X.",
+            "preferred-name": {"ce:surname": "Author", "ce:given-name": "X"},
+            "affiliation": {"@id": str(rng.randrange(10**7, 10**8))},
+        }
+        for k in range(n_authors)
+    ]
+    words = ["model", "cell", "network", "thai", "patient", "catalyst", "learning", "data"]
+    abstract = " ".join(rng.choice(words) for _ in range(rng.randrange(80, 250)))
+    references = [
+        {
+            "@id": str(r),
+            "ref-info": {
+                "ref-title": {"ref-titletext": " ".join(rng.choice(words) for _ in range(10))},
+                "ref-publicationyear": {"@first": str(rng.randrange(1980, 2023))},
+                "ref-authors": {"author": [{"ce:indexed-name": f"Ref{r}{a} Y."} for a in range(3)]},
+            },
+        }
+        for r in range(rng.randrange(10, 60))
+    ]
+    return {
+        "abstracts-retrieval-response": {
+            "coredata": {
+                "eid": f"2-s2.0-{850000000 + i}",
+                "dc:title": " ".join(rng.choice(words) for _ in range(12)),
+                "prism:coverDate": f"{rng.randrange(2018, 2024)}-01-01",
+                "prism:publicationName": f"Journal {rng.randrange(500)}",
+                "citedby-count": str(rng.randrange(200)),
+                "prism:doi": f"10.1000/{i}",
+                "dc:description": abstract,
+            },
+            "authors": {"author": authors},
+            "subject-areas": {"subject-area": [{"$": "Medicine", "@code": "2700"}]},
+            "affiliation": [{"affilname": "Chulalongkorn University",
+                             "affiliation-country": "Thailand"}],
+            "item": {"bibrecord": {"tail": {"bibliography": {"reference": references}}}},
+        }
+    }
+
+
+def make_corpus(n_docs: int, seed: int = 42):
+    import json
+
+    rng = random.Random(seed)
+    return [json.dumps(synthetic_document(i, rng)).encode("utf-8") for i in range(n_docs)]
+
+
+def best_rate(fn, corpus, repeat):
+    """Best records/second of fn over the corpus across `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(corpus)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON decoder backends.")
+    parser.add_argument("--docs", type=int, default=5000, help="synthetic documents")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per backend")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs)
+    mb = sum(len(raw) for raw in corpus) / 1e6
+    print(f"Synthetic corpus: {len(corpus)} documents, {mb:.1f} MB")
+
+    json_decoders.set_decoder("json")
+    reference = [parse_document(json_decoders.loads(raw), i) for i, raw in enumerate(corpus)]
+
+    rows = []
+    for name in json_decoders.available_backends():
+        json_decoders.set_decoder(name)
+        loads = json_decoders.loads
+
+        def decode(docs):
+            for raw in docs:
+                loads(raw)
+
+        def decode_parse(docs):
+            return [parse_document(loads(raw), i) for i, raw in enumerate(docs)]
+
+        rows.append({
+            "backend": name,
+            "decode_rec_per_s": best_rate(decode, corpus, args.repeat),
+            "parse_rec_per_s": best_rate(decode_parse, corpus, args.repeat),
+            "matches_stdlib": decode_parse(corpus) == reference,
+        })
+
+    result = pd.DataFrame(rows)
+    stdlib = result.loc[result["backend"] == "json", "parse_rec_per_s"].iloc[0]
+    result["speedup"] = result["parse_rec_per_s"] / stdlib
+    result = result.sort_values("parse_rec_per_s", ascending=False)
+    print(result.to_string(index=False, float_format=lambda x: f"{x:,.1f}"))
+
+
+if __name__ == "__main__":
+    main()
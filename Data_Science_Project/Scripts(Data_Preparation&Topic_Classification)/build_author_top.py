@@ -1,48 +1,113 @@
+import argparse
+import pickle
+import tempfile
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 EDGES_PATH = PROJECT_ROOT / "author_edges.csv"
+EDGES_TOP_PATH = PROJECT_ROOT / "author_top_edges.csv"
+NODES_TOP_PATH = PROJECT_ROOT / "author_top_nodes.csv"
+DEGREES_PATH = PROJECT_ROOT / "author_degrees.csv"
 
-chunksize = 500000
-counts = {}
 
-for chunk in pd.read_csv(EDGES_PATH, chunksize=chunksize):
-    for col in ["source", "target"]:
-        vals = chunk[col].value_counts()
-        for name, c in vals.items():
-            counts[name] = counts.get(name, 0) + int(c)
+def author_top(edges_path: Path, top_n: int, chunksize: int = 500000):
+    """Degrees of all authors in an edge file and the top-N authors' edges.
 
-deg_df = pd.DataFrame(
-    {"author": list(counts.keys()), "degree": list(counts.values())}
-)
-deg_df = deg_df.sort_values("degree", ascending=False)
+    Returns (degrees, edges incident to the top-N authors, top-N nodes)."""
+    # One scan over the edge file. Authors are keyed by the source/target
+    # columns (author_id, or the name in edge files written without
+    # source_name/target_name) and coded to int32 as they appear; degrees
+    # are accumulated with bincount. Only the two int32 endpoint codes of
+    # each edge stay in memory: the other columns are pickled chunk by
+    # chunk to a temporary file and read back once, keeping just the rows
+    # incident to the top-N authors.
+    header = pd.read_csv(edges_path, nrows=0).columns
+    extra_cols = [c for c in header if c not in ("source", "target")]
+    has_ids = {"source_name", "target_name"} <= set(header)
+    name_cols = ["source_name", "target_name"] if has_ids else ["source", "target"]
 
-top_n = 100
-top_authors = deg_df.head(top_n)["author"].tolist()
+    keys = None
+    key_names = []
+    counts = np.zeros(0, dtype=np.int64)
+    src_parts, dst_parts = [], []
+    spill = tempfile.TemporaryFile()
 
-print("Top authors:")
-print(deg_df.head(20))
+    for chunk in pd.read_csv(edges_path, chunksize=chunksize):
+        pair_keys = pd.concat([chunk["source"], chunk["target"]], ignore_index=True)
+        pair_names = pd.concat([chunk[name_cols[0]], chunk[name_cols[1]]], ignore_index=True).to_numpy()
+        local, uniques = pd.factorize(pair_keys)
+        if keys is None:
+            keys = pd.Index(uniques[:0])
 
-EDGES_TOP_PATH = PROJECT_ROOT / "author_top_edges.csv"
-NODES_TOP_PATH = PROJECT_ROOT / "author_top_nodes.csv"
-DEGREES_PATH = PROJECT_ROOT / "author_degrees.csv"
+        new = ~uniques.isin(keys)
+        if new.any():
+            # name of each new author, from its first appearance in the chunk
+            first = np.empty(len(uniques), dtype=np.int64)
+            first[local[::-1]] = np.arange(len(local) - 1, -1, -1)
+            key_names.append(pair_names[first[new]])
+            keys = keys.append(pd.Index(uniques[new]))
+        pair_codes = keys.get_indexer(uniques).astype(np.int32)[local]
+
+        counts = np.pad(counts, (0, len(keys) - len(counts)))
+        counts += np.bincount(pair_codes, minlength=len(keys))
+
+        src_parts.append(pair_codes[:len(chunk)])
+        dst_parts.append(pair_codes[len(chunk):])
+        pickle.dump(chunk[extra_cols], spill, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if keys is None:
+        keys = pd.Index([])
+    names = np.concatenate(key_names) if key_names else np.array([], dtype=object)
+    order = np.argsort(-counts, kind="stable")
+    deg_df = pd.DataFrame({"author": names[order], "degree": counts[order]})
+    if has_ids:
+        deg_df.insert(1, "author_id", keys.to_numpy()[order])
+
+    top_n = min(top_n, len(counts))
+    top_codes = np.argpartition(-counts, top_n - 1)[:top_n] if top_n else np.array([], dtype=int)
+    top_codes = top_codes[np.argsort(-counts[top_codes], kind="stable")]
+
+    is_top = np.zeros(len(counts), dtype=bool)
+    is_top[top_codes] = True
+
+    spill.seek(0)
+    parts = []
+    for src, dst in zip(src_parts, dst_parts):
+        mask = is_top[src] | is_top[dst]
+        extra = pickle.load(spill)[mask]
+        part = pd.DataFrame({"source": keys.to_numpy()[src[mask]], "target": keys.to_numpy()[dst[mask]]})
+        for c in extra_cols:
+            part[c] = extra[c].to_numpy()
+        parts.append(part)
+    spill.close()
+    edges_top_df = (pd.concat(parts, ignore_index=True) if parts
+                    else pd.DataFrame(columns=["source", "target"] + extra_cols))
+    nodes_top_df = pd.DataFrame({"node": keys.to_numpy()[top_codes], "label": names[top_codes], "type": "author"})
+    return deg_df, edges_top_df, nodes_top_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Author degrees and the edges of the top-N authors.")
+    parser.add_argument("--top-n", type=int, default=100, help="number of top authors by degree")
+    parser.add_argument("--chunksize", type=int, default=500000, help="edge rows read per chunk")
+    args = parser.parse_args()
 
-deg_df.to_csv(DEGREES_PATH, index=False)
+    deg_df, edges_top_df, nodes_top_df = author_top(EDGES_PATH, args.top_n, args.chunksize)
 
-edges_top = []
+    print("Top authors:")
+    print(deg_df.head(20))
 
-for chunk in pd.read_csv(EDGES_PATH, chunksize=chunksize):
-    mask = chunk["source"].isin(top_authors) | chunk["target"].isin(top_authors)
-    edges_top.append(chunk.loc[mask])
+    deg_df.to_csv(DEGREES_PATH, index=False)
+    edges_top_df.to_csv(EDGES_TOP_PATH, index=False)
+    nodes_top_df.to_csv(NODES_TOP_PATH, index=False)
 
-edges_top_df = pd.concat(edges_top, ignore_index=True)
-edges_top_df.to_csv(EDGES_TOP_PATH, index=False)
+    print("Saved author degrees to", DEGREES_PATH)
+    print("Saved top edges to", EDGES_TOP_PATH)
+    print("Saved top nodes to", NODES_TOP_PATH)
 
-nodes_top_df = pd.DataFrame({"node": top_authors, "type": "author"})
-nodes_top_df.to_csv(NODES_TOP_PATH, index=False)
 
-print("Saved author degrees to", DEGREES_PATH)
-print("Saved top edges to", EDGES_TOP_PATH)
-print("Saved top nodes to", NODES_TOP_PATH)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
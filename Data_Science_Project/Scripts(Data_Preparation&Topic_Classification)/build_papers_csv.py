@@ -1,24 +1,102 @@
-import json
+import argparse
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
 from tqdm import tqdm
 import pandas as pd
 
+import json_decoders
+from corpus_shards import has_shard, is_current, iter_members, load_index, member_source, shard_path
+from link_tables import SOURCE_COLUMNS as LINK_SOURCE_COLUMNS, write_link_tables
+from table_io import FORMATS, BatchWriter, read_table, write_table
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_ROOT = PROJECT_ROOT / "Data"
 
 YEARS = ["2018", "2019", "2020", "2021", "2022", "2023"]
 
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNKSIZE = 256
+
+PAPER_COLUMNS = [
+    "eid", "title", "cover_date", "year", "journal", "citedby_count", "doi",
+    "authors_str", "author_ids_str", "subject_areas_str", "countries_str",
+    "source_file",
+]
+TOPIC_COLUMNS = ["eid", "title", "year", "abstract", "subject_areas_str", "source_file"]
+
+PAPERS_PATH = PROJECT_ROOT / "papers_all_years.csv"
+TOPIC_PATH = PROJECT_ROOT / "topic_data.csv"
+MANIFEST_PATH = PROJECT_ROOT / "ingest_manifest.pkl"
+MANIFEST_VERSION = 3
+RECORD_CACHE_DIR = PROJECT_ROOT / "ingest_cache"
+RECORD_COLUMNS = PAPER_COLUMNS + ["abstract"]
+
+
+def extract_abstract(resp: dict):
+    """Extract abstract text from different possible Scopus locations."""
+    core = resp.get("coredata", {})
+
+    abstract = core.get("dc:description")
+    if abstract:
+        return abstract
+
+    try:
+        item = resp.get("item", {})
+        bibrecord = item.get("bibrecord", {})
+        head = bibrecord.get("head", {})
+        abstracts = head.get("abstracts", {})
+
+        if isinstance(abstracts, dict):
+            text = abstracts.get("abstract", {}).get("ce:para")
+            if text:
+                return text
+        elif isinstance(abstracts, list):
+            for ab in abstracts:
+                if not isinstance(ab, dict):
+                    continue
+                text = ab.get("abstract", {}).get("ce:para")
+                if text:
+                    return text
+    except:
+        pass
+
+    return None
+
+
 def parse_paper(path: Path):
     """Read ONE JSON file and return a dict with clean fields.
+       The dict holds every field needed by papers_all_years.csv and
+       topic_data.csv, so each file is decoded only once.
        Returns None if something is wrong."""
     try:
-        with open(path, encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = json_decoders.loads(f.read())
     except Exception as e:
         print(f"Error reading {path}: {e}")
         return None
 
+    return parse_document(data, path)
+
+
+def parse_blob(item):
+    """Parse ONE packed document given as (source, raw bytes)."""
+    source, raw = item
+    try:
+        data = json_decoders.loads(raw)
+    except Exception as e:
+        print(f"Error reading {source}: {e}")
+        return None
+
+    return parse_document(data, source)
+
+
+def parse_document(data: dict, path):
+    """Build the clean record from an already decoded Scopus document."""
     resp = data.get("abstracts-retrieval-response", {})
     core = resp.get("coredata", {})
 
@@ -108,33 +186,415 @@ def parse_paper(path: Path):
         "author_ids_str": author_ids_str,
         "subject_areas_str": subject_areas_str,
         "countries_str": countries_str,
+        "abstract": extract_abstract(resp),
         "source_file": str(path),
     }
 
 
-def main():
-    records = []
+def list_year_files(year_dir: Path):
+    """Return the sorted paper files of one year directory."""
+    return sorted(
+        f for f in year_dir.iterdir()
+        if f.is_file() and not f.name.startswith(".")
+    )
+
+
+def map_ordered(fn, items, executor=None, chunksize=DEFAULT_CHUNKSIZE):
+    """map() over items, in the worker processes when executor is given.
+
+    Items go to the workers in chunks of `chunksize` and results come back
+    in input order, so the output is identical to a single-process run.
+    Items are submitted a slice at a time, so a lazy iterable (such as
+    shard members) is never fully materialised.
+    """
+    if executor is None:
+        yield from map(fn, items)
+        return
+
+    it = iter(items)
+    while True:
+        block = list(islice(it, chunksize * 64))
+        if not block:
+            return
+        yield from executor.map(fn, block, chunksize=chunksize)
+
+
+def parse_files(files, executor=None, chunksize=DEFAULT_CHUNKSIZE, desc=None):
+    """Yield parse_paper() results for files, in the same order as files."""
+    results = map_ordered(parse_paper, files, executor, chunksize)
+    yield from tqdm(results, total=len(files), desc=desc)
+
+
+def scan_raw(raw: bytes, source, size, mtime_ns):
+    """Return (manifest entry, parsed record) for one raw document.
+
+    The entry only holds size, mtime, content hash and whether the document
+    parsed; the record (None on failure) goes to the per-year record cache."""
+    try:
+        record = parse_document(json_decoders.loads(raw), source)
+    except Exception as e:
+        print(f"Error reading {source}: {e}")
+        record = None
+
+    entry = {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "sha1": hashlib.sha1(raw).hexdigest(),
+        "ok": record is not None,
+    }
+    return entry, record
+
+
+def scan_file(path: Path):
+    """Hash and parse ONE file for the manifest (see scan_raw)."""
+    st = path.stat()
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    return scan_raw(raw, path, st.st_size, st.st_mtime_ns)
+
+
+def scan_blob(item):
+    """Hash and parse ONE packed document given as (source, raw bytes, mtime)."""
+    source, raw, mtime_ns = item
+    return scan_raw(raw, source, len(raw), mtime_ns)
+
+
+def manifest_key(year, name) -> str:
+    """Manifest key of a paper: "<year>/<file name>", the same whether the
+    paper is read from Data/<year>/ or from the year's shard."""
+    return f"{year}/{name}"
+
+
+def load_manifest(path: Path = MANIFEST_PATH):
+    """Load the ingest manifest, or an empty one if missing or outdated."""
+    if path.exists():
+        with open(path, "rb") as f:
+            manifest = pickle.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+        print(f"Ignoring manifest {path}: version {manifest.get('version')}")
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def save_manifest(manifest: dict, path: Path = MANIFEST_PATH):
+    """Write the manifest atomically so an interrupted run keeps the old one."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(manifest, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def record_cache_path(year) -> Path:
+    return RECORD_CACHE_DIR / f"{year}.parquet"
+
+
+def load_record_cache(year) -> dict:
+    """Load a year's cached records as {file name: record}, or {} if missing."""
+    path = record_cache_path(year)
+    if not path.exists():
+        return {}
+    df = pd.read_parquet(path).reindex(columns=["name"] + RECORD_COLUMNS)
+    df = df.astype(object).where(df.notna(), None)
+    names = df.pop("name").tolist()
+    return dict(zip(names, df.to_dict("records")))
 
-    for y in YEARS:
-        year_dir = DATA_ROOT / y
-        print(f"Processing year {y} in {year_dir}...")
 
-        files = sorted(
-            f for f in year_dir.iterdir()
-            if f.is_file() and not f.name.startswith(".")
-        )
+def save_record_cache(year, names, records):
+    """Write a year's parsed records, keyed by file name, atomically.
 
-        for fpath in tqdm(files, desc=f"Year {y}"):
-            rec = parse_paper(fpath)
-            if rec:
-                records.append(rec)
+    Files that could not be parsed (record None) are left out."""
+    pairs = [(n, r) for n, r in zip(names, records) if r is not None]
+    df = pd.DataFrame([r for _, r in pairs]).reindex(columns=RECORD_COLUMNS)
+    df.insert(0, "name", [n for n, _ in pairs])
+    df["citedby_count"] = df["citedby_count"].astype("Int64")
+    for col in df.columns.drop("citedby_count"):
+        # odd Scopus fields (e.g. a structured abstract) are kept as their text
+        df[col] = df[col].map(lambda v: v if isinstance(v, str) else str(v), na_action="ignore")
+    df = df.astype({col: "string" for col in df.columns.drop("citedby_count")})
+
+    path = record_cache_path(year)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def merge_year_records(year, names, fresh: dict, cached: dict):
+    """Return a year's records in file order and refresh its record cache.
+
+    Re-parsed papers come from `fresh`, the others from `cached`; both are
+    keyed by file name. The cache is rewritten only when something changed."""
+    records = [fresh[n] if n in fresh else cached.get(n) for n in names]
+    kept = {n for n, r in zip(names, records) if r is not None}
+    if fresh or kept != set(cached) or not record_cache_path(year).exists():
+        save_record_cache(year, names, records)
+    return records
+
+
+def is_unchanged(entry, path: Path):
+    """True if a manifest entry still matches the file's size and mtime."""
+    if entry is None:
+        return False
+    st = path.stat()
+    return entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+
+def update_manifest(manifest: dict, files, executor=None, chunksize=DEFAULT_CHUNKSIZE,
+                    desc=None, cached=None):
+    """Re-scan added or modified files and refresh their manifest entries.
+
+    Files are Data/<year>/ paths, keyed by manifest_key(). Files whose size
+    and mtime are unchanged are not opened, unless `cached` (the year's
+    record cache) is given and lacks their record. Returns the number of
+    re-scanned files, how many of them have new content (added files, or a
+    content hash different from the old entry) and the re-parsed records
+    as {file name: record}."""
+    entries = manifest["files"]
+
+    def key(f):
+        return manifest_key(f.parent.name, f.name)
+
+    def is_stale(f):
+        entry = entries.get(key(f))
+        if not is_unchanged(entry, f):
+            return True
+        return cached is not None and entry["ok"] and f.name not in cached
+
+    stale = [f for f in files if is_stale(f)]
+    if not stale:
+        return 0, 0, {}
+
+    results = map_ordered(scan_file, stale, executor, chunksize)
+
+    n_changed = 0
+    fresh = {}
+    for path, (entry, record) in tqdm(zip(stale, results), total=len(stale), desc=desc):
+        old = entries.get(key(path))
+        if old is None or old["sha1"] != entry["sha1"]:
+            n_changed += 1
+        entries[key(path)] = entry
+        fresh[path.name] = record
+    return len(stale), n_changed, fresh
+
+
+def file_records(year, executor, chunksize, manifest, seen):
+    """Return (file count, records) for a year read from Data/<year>/."""
+    year_dir = DATA_ROOT / year
+    print(f"Processing year {year} in {year_dir}...")
+
+    files = list_year_files(year_dir)
+    if manifest is None:
+        return len(files), parse_files(files, executor, chunksize, desc=f"Year {year}")
+
+    cached = load_record_cache(year)
+    n_scanned, n_changed, fresh = update_manifest(manifest, files, executor, chunksize,
+                                                  desc=f"Year {year}", cached=cached)
+    print(f"Year {year}: re-scanned {n_scanned} files, {n_changed} new or modified")
+    names = [f.name for f in files]
+    seen.update(manifest_key(year, name) for name in names)
+    return len(files), merge_year_records(year, names, fresh, cached)
+
+
+def shard_records(year, executor, chunksize, manifest, seen):
+    """Return (member count, records) for a year read from its packed shard.
+
+    With a manifest, members are compared by the SHA-1 stored in the shard
+    index, so only added or modified papers (or ones missing from the record
+    cache) are read and parsed. Entries and cached records are keyed like in
+    file mode, so they survive switching between the two."""
+    print(f"Processing year {year} from {shard_path(year)}...")
+
+    index = load_index(year)
+    sources = [member_source(year, name) for name in index["name"]]
+    if manifest is None:
+        items = zip(sources, iter_members(year, index))
+        results = map_ordered(parse_blob, items, executor, chunksize)
+        return len(index), tqdm(results, total=len(index), desc=f"Year {year}")
+
+    entries = manifest["files"]
+    cached = load_record_cache(year)
+    names = index["name"].tolist()
+    keys = [manifest_key(year, name) for name in names]
+    mtimes = index["mtime_ns"].tolist() if "mtime_ns" in index.columns else [None] * len(index)
+
+    def is_stale(name, key, sha1):
+        entry = entries.get(key)
+        if entry is None or entry["sha1"] != sha1:
+            return True
+        return entry["ok"] and name not in cached
+
+    stale = [
+        i for i, (name, key, sha1) in enumerate(zip(names, keys, index["sha1"]))
+        if is_stale(name, key, sha1)
+    ]
+    fresh = {}
+    if stale:
+        items = zip([sources[i] for i in stale], iter_members(year, index.iloc[stale]),
+                    [mtimes[i] for i in stale])
+        results = map_ordered(scan_blob, items, executor, chunksize)
+        for i, (entry, record) in tqdm(zip(stale, results), total=len(stale),
+                                       desc=f"Year {year}"):
+            entries[keys[i]] = entry
+            fresh[names[i]] = record
+    print(f"Year {year}: {len(stale)} new or modified papers")
+    seen.update(keys)
+    return len(index), merge_year_records(year, names, fresh, cached)
+
+
+def iter_records(years=YEARS, workers=DEFAULT_WORKERS, chunksize=DEFAULT_CHUNKSIZE,
+                 manifest=None, source="auto", decoder="auto"):
+    """Yield parsed records for all years, year by year in file order.
+
+    `source` picks where papers are read from: "files" (Data/<year>/),
+    "shards" (Data/shards/, see corpus_shards.py) or "auto", which uses a
+    year's shard when it has been packed and Data/<year>/ has not changed
+    since (otherwise the files are read and a re-pack is suggested). `decoder` is the JSON backend
+    (see json_decoders.py), set in this process and in every worker.
+
+    With a manifest only added or modified papers are parsed; records of
+    unchanged ones come from the per-year record cache (ingest_cache/), and
+    entries of papers that no longer exist are dropped from the manifest.
+    Only the year being processed is held in memory."""
+    decoder = json_decoders.set_decoder(decoder)
+    print("JSON decoder:", decoder)
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=json_decoders.set_decoder,
+                                       initargs=(decoder,))
+    seen = set()
+    try:
+        for y in years:
+            use_shard = source == "shards"
+            if source == "auto" and has_shard(y):
+                use_shard = is_current(y)
+                if not use_shard:
+                    print(f"Year {y}: {shard_path(y)} is older than Data/{y}/, reading the files "
+                          "(run corpus_shards.py to re-pack)")
+            if use_shard:
+                n_total, records = shard_records(y, executor, chunksize, manifest, seen)
+            else:
+                n_total, records = file_records(y, executor, chunksize, manifest, seen)
+
+            n_ok = 0
+            for rec in records:
+                if rec:
+                    n_ok += 1
+                    yield rec
+            print(f"Year {y}: {n_ok} of {n_total} files parsed")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if manifest is not None:
+        deleted = set(manifest["files"]) - seen
+        for key in deleted:
+            del manifest["files"][key]
+        if deleted:
+            print(f"Dropped {len(deleted)} deleted files from the manifest")
+
+
+def split_outputs(df: pd.DataFrame):
+    """Split unified records into the papers and topic datasets."""
+    papers = df.reindex(columns=PAPER_COLUMNS)
+    # nullable ints keep the CSV identical whether or not a batch has gaps
+    papers["citedby_count"] = papers["citedby_count"].astype("Int64")
+    topic = df.reindex(columns=TOPIC_COLUMNS)
+    topic = topic[topic["abstract"].notna() & (topic["abstract"] != "")]
+    return papers, topic.reset_index(drop=True)
+
+
+def batched(records, batch_size):
+    """Group an iterable of records into lists of at most batch_size."""
+    batch = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_args(description="Build papers_all_years.csv and topic_data.csv from the Scopus dump."):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="number of parser processes (1 = no multiprocessing)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="files sent to a worker per dispatch")
+    parser.add_argument("--source", choices=["auto", "files", "shards"], default="auto",
+                        help="read Data/<year>/ files or packed shards "
+                             "(auto = shards for packed years whose files are unchanged)")
+    parser.add_argument("--json-decoder", choices=["auto"] + json_decoders.BACKENDS,
+                        default="auto",
+                        help="JSON backend (auto = fastest installed, json = stdlib)")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"only parse files added or changed since the last run "
+                             f"(tracked in {MANIFEST_PATH.name})")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="output storage: CSV, typed Parquet, or both")
+    parser.add_argument("--batch-size", type=int, default=0,
+                        help="stream records to the outputs in batches of this many "
+                             "papers instead of building one DataFrame (0 = off)")
+    parser.add_argument("--skip-link-tables", action="store_true",
+                        help="do not rebuild the paper/author/subject/country link tables")
+    return parser.parse_args()
+
+
+def collect_records(args):
+    """Yield the records of the ingestion pass selected by the arguments."""
+    manifest = load_manifest() if args.incremental else None
+    yield from iter_records(workers=args.workers, chunksize=args.chunksize,
+                            manifest=manifest, source=args.source,
+                            decoder=args.json_decoder)
+    if manifest is not None:
+        save_manifest(manifest)
+        print("Saved manifest to", MANIFEST_PATH)
+
+
+def write_streaming(records, batch_size, fmt):
+    """Flush records to both datasets batch by batch.
+
+    Only one batch of records is alive at a time, so peak memory does not
+    depend on how many years are processed."""
+    papers_out = BatchWriter(PAPERS_PATH, PAPER_COLUMNS, fmt)
+    topic_out = BatchWriter(TOPIC_PATH, TOPIC_COLUMNS, fmt)
+    for batch in batched(records, batch_size):
+        papers, topic = split_outputs(pd.DataFrame(batch))
+        papers_out.write(papers)
+        topic_out.write(topic)
+
+    print("Total papers:", papers_out.rows)
+    print("Papers with abstract:", topic_out.rows)
+    return papers_out.close() + topic_out.close()
+
+
+def main():
+    args = parse_args()
+
+    records = collect_records(args)
+
+    if args.batch_size > 0:
+        for out in write_streaming(records, args.batch_size, args.format):
+            print("Saved to", out)
+        papers = None
+    else:
+        papers, topic = split_outputs(pd.DataFrame(list(records)))
+        print("Total papers:", len(papers))
+        print("Papers with abstract:", len(topic))
 
-    df = pd.DataFrame(records)
-    print("Total papers:", len(df))
+        for out in write_table(papers, PAPERS_PATH, args.format):
+            print("Saved to", out)
+        for out in write_table(topic, TOPIC_PATH, args.format):
+            print("Saved to", out)
 
-    output_path = PROJECT_ROOT / "papers_all_years.csv"
-    df.to_csv(output_path, index=False)
-    print("Saved to", output_path)
+    if not args.skip_link_tables:
+        if papers is None:
+            # streaming mode: reload only the list columns, not the abstracts
+            papers = read_table(PAPERS_PATH, columns=LINK_SOURCE_COLUMNS)
+        for out in write_link_tables(papers, args.format):
+            print("Saved to", out)
 
 
 if __name__ == "__main__":
@@ -1,56 +1,177 @@
+import argparse
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import networkx as nx
+from scipy import sparse
+
+from author_graph import GRAPH_DIR, save_graph
+from author_years import YEARS_DIR, update_year_graphs
+from link_tables import SOURCE_COLUMNS, build_link_tables, have_link_tables, read_link_table
+from table_io import read_table
 # import matplotlib.pyplot as plt
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CSV_PATH = PROJECT_ROOT / "papers_all_years.csv"
 
-df = pd.read_csv(CSV_PATH, usecols=["authors_str"])
-df = df.dropna(subset=["authors_str"])
+# How papers with more than --max-authors authors (e.g. LHC collaborations)
+# enter the network:
+#   clique     - all author pairs, like any other paper
+#   cap        - no co-author edges at all
+#   downweight - all pairs, each weighted 1/(k-1) instead of 1 (Newman);
+#                combine with --min-weight to keep the edge file bounded
+#   bipartite  - no pairwise edges; the paper-author memberships are
+#                written to author_hyperedges.csv instead
+HYPER_POLICIES = ["clique", "cap", "downweight", "bipartite"]
+
+
+def paper_author_incidence(paper_authors: pd.DataFrame, n_papers: int, n_authors: int):
+    """Paper x author 0/1 CSR matrix from (paper_id, author_id) rows."""
+    # the built tables also carry author positions: one entry per (paper, author)
+    paper_authors = paper_authors.drop_duplicates(["paper_id", "author_id"])
+    return sparse.csr_matrix(
+        (
+            np.ones(len(paper_authors), dtype=np.int32),
+            (paper_authors["paper_id"].to_numpy(), paper_authors["author_id"].to_numpy()),
+        ),
+        shape=(n_papers, n_authors),
+    )
+
+
+def coauthor_edges(incidence, hyper_policy: str = "clique", max_authors: int = 100,
+                   min_weight: float = 0):
+    """Upper-triangle co-author edges of a paper x author incidence matrix.
+
+    Returns (src, dst, weight, hyper, paper_weight): the author pairs with
+    their (weighted) number of shared papers, the hyper-authored paper
+    mask, and the weight each paper gives its author pairs under
+    hyper_policy (see HYPER_POLICIES)."""
+    n_papers = incidence.shape[0]
+    authors_per_paper = np.diff(incidence.indptr)
+    hyper = authors_per_paper > max_authors
+
+    pair_incidence = incidence
+    weighted_incidence = incidence
+    paper_weight = np.ones(n_papers)
+    if hyper_policy == "downweight":
+        paper_weight = np.where(hyper, 1.0 / np.maximum(authors_per_paper - 1, 1), 1.0)
+        weighted_incidence = sparse.diags(paper_weight, dtype=np.float64) @ incidence
+    elif hyper_policy in ("cap", "bipartite"):
+        paper_weight = (~hyper).astype(np.float64)
+        pair_incidence = weighted_incidence = incidence[~hyper]
+
+    # (author x author)[i, j] = (weighted) number of papers shared by i and j
+    shared = sparse.triu(pair_incidence.T @ weighted_incidence, k=1).tocsr()
+    shared.eliminate_zeros()
+    shared = shared.tocoo()
+    keep = shared.data >= min_weight
+    return shared.row[keep], shared.col[keep], shared.data[keep], hyper, paper_weight
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the weighted co-author network.")
+    parser.add_argument("--hyper-policy", choices=HYPER_POLICIES, default="bipartite",
+                        help="how to handle hyper-authored papers")
+    parser.add_argument("--max-authors", type=int, default=100,
+                        help="papers with more authors than this are hyper-authored")
+    parser.add_argument("--min-weight", type=float, default=0,
+                        help="drop edges whose weight is below this")
+    args = parser.parse_args()
+
+    # Authors are integer-coded by link_tables (by @auid where available), so
+    # the co-occurrence counts run on a sparse paper x author matrix instead
+    # of Python loops over name strings.
+    if have_link_tables():
+        paper_authors = read_link_table("paper_authors", columns=["paper_id", "author_id"])
+        authors = read_link_table("dim_authors")
+        papers = read_link_table("link_papers", columns=["paper_id", "eid", "year"])
+    else:
+        tables = build_link_tables(read_table(CSV_PATH, columns=SOURCE_COLUMNS))
+        paper_authors, authors = tables["paper_authors"], tables["dim_authors"]
+        papers = tables["link_papers"]
+
+    n_papers = len(papers)
+    n_authors = len(authors)
+
+    incidence = paper_author_incidence(paper_authors, n_papers, n_authors)
+    src, dst, weight, hyper, paper_weight = coauthor_edges(
+        incidence, args.hyper_policy, args.max_authors, args.min_weight)
+
+    authors_per_paper = np.diff(incidence.indptr)
+    n_hyper_pairs = int((authors_per_paper[hyper].astype(np.int64) * (authors_per_paper[hyper] - 1) // 2).sum())
+    print(f"Hyper-authored papers (> {args.max_authors} authors): {int(hyper.sum())}, "
+          f"{n_hyper_pairs} author pairs, policy: {args.hyper_policy}")
+    print("Total unique co-author pairs (edges):", len(weight))
+
+    degree = np.bincount(src, minlength=n_authors) + np.bincount(dst, minlength=n_authors)
+    names = authors["name"].to_numpy()
+
+    top_ids = np.argsort(-degree, kind="stable")[:50]
+    top_authors = [(names[i], int(degree[i])) for i in top_ids]
 
-edges_set = set()
+    print("\nTop 20 authors by degree (number of co-authors):")
+    for name, d in top_authors[:20]:
+        print(f"{name}: {d}")
 
-for authors_str in df["authors_str"]:
-    authors = [a.strip() for a in str(authors_str).split(";") if a.strip()]
-    n = len(authors)
-    for i in range(n):
-        for j in range(i + 1, n):
-            a = authors[i]
-            b = authors[j]
-            if a < b:
-                edges_set.add((a, b))
-            else:
-                edges_set.add((b, a))
+    has_edges = degree > 0
 
-edges = list(edges_set)
-print("Total unique co-author pairs (edges):", len(edges))
+    if args.hyper_policy == "bipartite":
+        members = incidence[hyper].tocoo()
+        hyper_ids = np.flatnonzero(hyper)[members.row]
+        hyper_df = pd.DataFrame({
+            "paper_id": hyper_ids,
+            "eid": papers.set_index("paper_id")["eid"].reindex(hyper_ids).to_numpy(),
+            "author_id": members.col,
+            "author": names[members.col],
+        })
+        has_edges[members.col] = True
+        hyper_path = PROJECT_ROOT / "author_hyperedges.csv"
+        hyper_df.to_csv(hyper_path, index=False)
+        print(f"Saved {len(hyper_df)} paper-author memberships of hyper-authored papers to", hyper_path)
+    # nodes and edges are keyed by author_id: different authors can share an
+    # indexed name ("Wang Y."), so the names are only labels
+    nodes_df = pd.DataFrame({
+        "node": authors["author_id"].to_numpy()[has_edges],
+        "label": names[has_edges],
+        "type": "author",
+        "auid": authors["auid"].to_numpy()[has_edges],
+    })
 
-G = nx.Graph()
-G.add_edges_from(edges)
+    edges_df = pd.DataFrame({
+        "source": src,
+        "target": dst,
+        "weight": weight,
+        "source_name": names[src],
+        "target_name": names[dst],
+    })
 
-deg = dict(G.degree())
-top_authors = sorted(deg.items(), key=lambda x: x[1], reverse=True)[:50]
+    nodes_path = PROJECT_ROOT / "author_nodes.csv"
+    edges_path = PROJECT_ROOT / "author_edges.csv"
 
-print("\nTop 20 authors by degree (number of co-authors):")
-for name, d in top_authors[:20]:
-    print(f"{name}: {d}")
+    nodes_df.to_csv(nodes_path, index=False)
+    edges_df.to_csv(edges_path, index=False)
 
-nodes = list(G.nodes())
-nodes_df = pd.DataFrame({"node": nodes})
-nodes_df["type"] = "author"
+    print("\nSaved author nodes to", nodes_path)
+    print("Saved author edges to", edges_path)
 
-edges_df = pd.DataFrame(edges, columns=["source", "target"])
+    year_by_paper = papers.set_index("paper_id")["year"].reindex(np.arange(n_papers))
+    save_graph(src, dst, weight, authors, incidence=incidence,
+               paper_year=year_by_paper.to_numpy(), paper_weight=paper_weight,
+               n_papers=n_papers, hyper_policy=args.hyper_policy,
+               max_authors=args.max_authors, min_weight=args.min_weight)
+    print("Saved CSR graph store to", GRAPH_DIR)
 
-nodes_path = PROJECT_ROOT / "author_nodes.csv"
-edges_path = PROJECT_ROOT / "author_edges.csv"
+    eid_by_paper = papers.set_index("paper_id")["eid"].reindex(np.arange(n_papers))
+    built = update_year_graphs(
+        incidence, year_by_paper.to_numpy(), paper_weight, eid_by_paper.to_numpy(), authors,
+        params={"hyper_policy": args.hyper_policy, "max_authors": args.max_authors},
+    )
+    print("Per-year graphs rebuilt:", built or "none (all years unchanged)")
+    print("Saved per-year graphs to", YEARS_DIR)
 
-nodes_df.to_csv(nodes_path, index=False)
-edges_df.to_csv(edges_path, index=False)
 
-print("\nSaved author nodes to", nodes_path)
-print("Saved author edges to", edges_path)
+if __name__ == "__main__":
+    main()
 
 # top_author_names = [name for name, _ in top_authors]
 # sub_nodes = set(top_author_names)
@@ -0,0 +1,202 @@
+"""Pack the per-paper Scopus JSON files into one shard file per year.
+
+Data/<year>/ holds one small JSON file per paper. Packing concatenates the
+raw bytes of a year's files into Data/shards/<year>.shard and writes
+Data/shards/<year>.idx.csv with each member's file name, EID, byte offset,
+length, SHA-1 and source file mtime. Readers can then stream a whole year with one open(),
+or fetch any paper by EID with a single seek (see ShardReader).
+
+Usage: python corpus_shards.py [--years 2018 2019 ...]
+"""
+import argparse
+import hashlib
+import os
+from pathlib import Path
+
+from tqdm import tqdm
+import pandas as pd
+
+import json_decoders
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_ROOT = PROJECT_ROOT / "Data"
+SHARD_ROOT = DATA_ROOT / "shards"
+
+YEARS = ["2018", "2019", "2020", "2021", "2022", "2023"]
+
+INDEX_COLUMNS = ["name", "eid", "offset", "length", "sha1", "mtime_ns"]
+
+
+def shard_path(year) -> Path:
+    return SHARD_ROOT / f"{year}.shard"
+
+
+def index_path(year) -> Path:
+    return SHARD_ROOT / f"{year}.idx.csv"
+
+
+def has_shard(year) -> bool:
+    return shard_path(year).exists() and index_path(year).exists()
+
+
+def is_current(year) -> bool:
+    """True if the year's shard still matches Data/<year>/.
+
+    Compares file names, sizes and mtimes with the shard index, so files
+    added, removed or modified after packing make the shard stale. A year
+    whose directory was removed after packing is served by its shard.
+    Indexes written before mtimes were recorded are compared by name and
+    size only."""
+    year_dir = DATA_ROOT / year
+    if not has_shard(year):
+        return False
+    if not year_dir.is_dir():
+        return True
+    files = sorted(
+        f for f in year_dir.iterdir()
+        if f.is_file() and not f.name.startswith(".")
+    )
+    index = load_index(year)
+    if [f.name for f in files] != list(index["name"]):
+        return False
+    stats = [f.stat() for f in files]
+    if any(st.st_size != length for st, length in zip(stats, index["length"])):
+        return False
+    if "mtime_ns" in index.columns:
+        return all(st.st_mtime_ns == m for st, m in zip(stats, index["mtime_ns"]))
+    return True
+
+
+def member_source(year, name) -> str:
+    """Value used as source_file for a paper read from a shard: the path of
+    the file it was packed from, as when the paper is read from Data/<year>/."""
+    return str(DATA_ROOT / str(year) / name)
+
+
+def read_eid(raw: bytes):
+    """Return the EID of one raw Scopus document, or None."""
+    try:
+        data = json_decoders.loads(raw)
+        return data["abstracts-retrieval-response"]["coredata"]["eid"]
+    except Exception:
+        return None
+
+
+def pack_year(year):
+    """Pack Data/<year>/ into its shard and index. Returns the member count."""
+    year_dir = DATA_ROOT / year
+    files = sorted(
+        f for f in year_dir.iterdir()
+        if f.is_file() and not f.name.startswith(".")
+    )
+
+    SHARD_ROOT.mkdir(parents=True, exist_ok=True)
+    tmp_shard = shard_path(year).with_suffix(".shard.tmp")
+    rows = []
+    offset = 0
+    with open(tmp_shard, "wb") as out:
+        for fpath in tqdm(files, desc=f"Pack {year}"):
+            mtime_ns = fpath.stat().st_mtime_ns
+            with open(fpath, "rb") as f:
+                raw = f.read()
+            out.write(raw)
+            rows.append({
+                "name": fpath.name,
+                "eid": read_eid(raw),
+                "offset": offset,
+                "length": len(raw),
+                "sha1": hashlib.sha1(raw).hexdigest(),
+                "mtime_ns": mtime_ns,
+            })
+            offset += len(raw)
+
+    index = pd.DataFrame(rows, columns=INDEX_COLUMNS)
+    tmp_index = index_path(year).with_suffix(".csv.tmp")
+    index.to_csv(tmp_index, index=False)
+    os.replace(tmp_shard, shard_path(year))
+    os.replace(tmp_index, index_path(year))
+    return len(index)
+
+
+def load_index(year) -> pd.DataFrame:
+    return pd.read_csv(
+        index_path(year),
+        dtype={"name": str, "eid": str, "offset": "int64", "length": "int64", "sha1": str,
+               "mtime_ns": "int64"},
+    )
+
+
+def iter_members(year, index: pd.DataFrame = None):
+    """Yield the raw bytes of the shard members listed in index, in order.
+
+    Members are read sequentially; a seek is only done when the index
+    skips over part of the shard."""
+    if index is None:
+        index = load_index(year)
+    with open(shard_path(year), "rb") as f:
+        pos = 0
+        for offset, length in zip(index["offset"], index["length"]):
+            if offset != pos:
+                f.seek(offset)
+            yield f.read(length)
+            pos = offset + length
+
+
+class ShardReader:
+    """Random access to packed papers by EID.
+
+    Loads the indexes of all packed years once; each lookup is then a
+    dict hit plus one seek and read in the year's shard.
+    """
+
+    def __init__(self, years=YEARS):
+        self._where = {}
+        self._files = {}
+        for y in years:
+            if not has_shard(y):
+                continue
+            index = load_index(y).dropna(subset=["eid"])
+            for eid, offset, length in zip(index["eid"], index["offset"], index["length"]):
+                self._where[eid] = (y, offset, length)
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, eid):
+        return eid in self._where
+
+    def get_raw(self, eid) -> bytes:
+        year, offset, length = self._where[eid]
+        f = self._files.get(year)
+        if f is None:
+            f = self._files[year] = open(shard_path(year), "rb")
+        f.seek(offset)
+        return f.read(length)
+
+    def get(self, eid) -> dict:
+        return json_decoders.loads(self.get_raw(eid))
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack Data/<year>/ files into indexed shards.")
+    parser.add_argument("--years", nargs="+", default=YEARS, help="years to pack")
+    args = parser.parse_args()
+
+    for y in args.years:
+        n = pack_year(y)
+        print(f"Packed {n} files into {shard_path(y)}")
+
+
+if __name__ == "__main__":
+    main()
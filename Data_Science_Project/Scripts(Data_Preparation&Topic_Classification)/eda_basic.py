@@ -1,15 +1,18 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+from link_tables import count_papers_by, have_link_tables
+from table_io import read_table
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CSV_PATH = PROJECT_ROOT / "papers_all_years.csv"
 
 print("Loading:", CSV_PATH)
 
-df = pd.read_csv(CSV_PATH)
+df = read_table(CSV_PATH)
 df["year"] = df["year"].astype(str)
+use_link_tables = have_link_tables()
 
 print("Number of papers:", len(df))
 print(df.head())
@@ -42,14 +45,18 @@ plt.ylabel("Frequency")
 plt.tight_layout()
 plt.show()
 
-subjects = (
-    df["subject_areas_str"]
-    .dropna()
-    .str.split("; ")
-    .explode()
-)
-
-subject_counts = subjects.value_counts().head(20)
+if use_link_tables:
+    subject_counts = count_papers_by(
+        "paper_subjects", "dim_subjects", "subject_id", "subject"
+    ).head(20)
+else:
+    subjects = (
+        df["subject_areas_str"]
+        .dropna()
+        .str.split("; ")
+        .explode()
+    )
+    subject_counts = subjects.value_counts().head(20)
 print("\nTop 20 Subject Areas:")
 print(subject_counts)
 
@@ -59,14 +66,18 @@ plt.xlabel("Count")
 plt.tight_layout()
 plt.show()
 
-countries = (
-    df["countries_str"]
-    .dropna()
-    .str.split("; ")
-    .explode()
-)
-
-country_counts = countries.value_counts().head(15)
+if use_link_tables:
+    country_counts = count_papers_by(
+        "paper_countries", "dim_countries", "country_id", "country"
+    ).head(15)
+else:
+    countries = (
+        df["countries_str"]
+        .dropna()
+        .str.split("; ")
+        .explode()
+    )
+    country_counts = countries.value_counts().head(15)
 print("\nTop 15 Countries:")
 print(country_counts)
 
@@ -1,12 +1,26 @@
+import argparse
 import json
 from pathlib import Path
 
+from corpus_shards import ShardReader
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DATA_ROOT = PROJECT_ROOT / "Data"
 example_file = DATA_ROOT / "2018" / "201800000"
 
-with open(example_file, encoding="utf-8") as f:
-    data = json.load(f)
+parser = argparse.ArgumentParser(description="Print the main fields of one Scopus record.")
+parser.add_argument("eid", nargs="?",
+                    help="EID to look up in the packed shards (default: the example file)")
+args = parser.parse_args()
+
+if args.eid:
+    with ShardReader() as reader:
+        if args.eid not in reader:
+            raise SystemExit(f"{args.eid} not found in the packed shards (run corpus_shards.py)")
+        data = reader.get(args.eid)
+else:
+    with open(example_file, encoding="utf-8") as f:
+        data = json.load(f)
 
 resp = data["abstracts-retrieval-response"]
 
@@ -0,0 +1,59 @@
+"""Pluggable JSON decoders for the Scopus ingestion scripts.
+
+The parsers call json_decoders.loads() instead of json.load(). Which
+backend it uses is set once per process with set_decoder(): "orjson" and
+"ujson" are used when installed, "json" (stdlib) is always available, and
+"auto" picks the first installed one in that order.
+
+Compare the backends on your machine with bench_json_decoders.py.
+"""
+import json
+
+BACKENDS = ["orjson", "ujson", "json"]
+
+
+def _import_backend(name):
+    """Return the loads() function of a backend, or None if not installed."""
+    if name == "json":
+        return json.loads
+    try:
+        module = __import__(name)
+    except ImportError:
+        return None
+    return module.loads
+
+
+def available_backends():
+    return [name for name in BACKENDS if _import_backend(name) is not None]
+
+
+def resolve(name="auto"):
+    """Map "auto" to the fastest installed backend and check the name."""
+    if name == "auto":
+        return available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON decoder {name!r}, choose from {BACKENDS + ['auto']}")
+    if _import_backend(name) is None:
+        raise ValueError(f"JSON decoder {name!r} is not installed")
+    return name
+
+
+_backend = "json"
+_loads = json.loads
+
+
+def set_decoder(name="auto"):
+    """Select the backend used by loads() in this process."""
+    global _backend, _loads
+    _backend = resolve(name)
+    _loads = _import_backend(_backend)
+    return _backend
+
+
+def current_decoder():
+    return _backend
+
+
+def loads(raw):
+    """Decode one JSON document (bytes or str) with the selected backend."""
+    return _loads(raw)
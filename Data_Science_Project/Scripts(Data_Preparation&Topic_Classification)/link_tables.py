@@ -0,0 +1,172 @@
+"""Normalized paper/author/subject/country tables.
+
+papers_all_years.csv stores authors, author IDs, subject areas and
+countries as "; "-joined strings. This module explodes them once into
+link tables keyed by integer IDs plus interned dimension tables:
+
+    link_papers      paper_id, eid, year
+    paper_authors    paper_id, author_id, position
+    paper_subjects   paper_id, subject_id, position
+    paper_countries  paper_id, country_id
+    dim_authors      author_id, auid, name
+    dim_subjects     subject_id, subject
+    dim_countries    country_id, country
+
+paper_id is the row number in papers_all_years. Authors are interned by
+Scopus @auid when a paper's ID list lines up with its name list, and by
+name otherwise. build_papers_csv.py writes these tables after every run;
+`python link_tables.py` rebuilds them from an existing papers file.
+
+link_tables.json records the size and mtime of the papers file the tables
+were built from; tables whose papers file has changed since are ignored.
+"""
+import argparse
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from table_io import FORMATS, parquet_path, read_table, write_table
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+PAPERS_PATH = PROJECT_ROOT / "papers_all_years.csv"
+STAMP_PATH = PROJECT_ROOT / "link_tables.json"
+
+SOURCE_COLUMNS = ["eid", "year", "authors_str", "author_ids_str",
+                  "subject_areas_str", "countries_str"]
+TABLES = ["link_papers", "paper_authors", "paper_subjects", "paper_countries",
+          "dim_authors", "dim_subjects", "dim_countries"]
+
+
+def table_path(name: str) -> Path:
+    return PROJECT_ROOT / f"{name}.csv"
+
+
+def papers_stamp() -> dict:
+    """Size and mtime of each stored copy (CSV, Parquet) of the papers file."""
+    stamp = {}
+    for p in (PAPERS_PATH, parquet_path(PAPERS_PATH)):
+        if p.exists():
+            st = p.stat()
+            stamp[p.name] = [st.st_size, st.st_mtime_ns]
+    return stamp
+
+
+def have_link_tables() -> bool:
+    """True when every table exists and was built from the current papers file.
+
+    Stale tables are reported and ignored, so callers fall back to the
+    "; "-joined columns of papers_all_years."""
+    if not all(
+        table_path(name).exists() or parquet_path(table_path(name)).exists()
+        for name in TABLES
+    ):
+        return False
+    built_from = None
+    if STAMP_PATH.exists():
+        with open(STAMP_PATH, encoding="utf-8") as f:
+            built_from = json.load(f)
+    if built_from != papers_stamp():
+        print(f"Link tables were not built from the current {PAPERS_PATH.name}; ignoring them "
+              "(run link_tables.py to rebuild)")
+        return False
+    return True
+
+
+def read_link_table(name: str, columns=None) -> pd.DataFrame:
+    return read_table(table_path(name), columns=columns)
+
+
+def explode_list(col: pd.Series, value_name: str) -> pd.DataFrame:
+    """Explode a "; "-joined column into (paper_id, value, position) rows."""
+    items = col.dropna().astype(str).str.split("; ").explode()
+    items = items[items.notna() & (items != "")]
+    out = pd.DataFrame({"paper_id": items.index.astype("int32"), value_name: items.values})
+    out["position"] = out.groupby("paper_id").cumcount().astype("int16")
+    return out
+
+
+def intern(values: pd.Series, id_name: str, value_name: str):
+    """Factorize values into int32 IDs. Returns (codes, dimension table)."""
+    codes, uniques = pd.factorize(values)
+    dim = pd.DataFrame({id_name: range(len(uniques)), value_name: uniques})
+    dim[id_name] = dim[id_name].astype("int32")
+    return codes.astype("int32"), dim
+
+
+def build_link_tables(papers: pd.DataFrame) -> dict:
+    """Build all link and dimension tables from the papers dataset."""
+    papers = papers.reset_index(drop=True)
+    tables = {"link_papers": pd.DataFrame({
+        "paper_id": papers.index.astype("int32"),
+        "eid": papers["eid"],
+        "year": pd.to_numeric(papers["year"], errors="coerce").astype("Int16"),
+    })}
+
+    names = explode_list(papers["authors_str"], "name")
+    ids = explode_list(papers["author_ids_str"], "auid")
+    sizes = pd.concat([names.groupby("paper_id").size(), ids.groupby("paper_id").size()],
+                      axis=1, keys=["names", "ids"])
+    aligned = sizes.index[sizes["names"] == sizes["ids"]]
+    ids = ids[ids["paper_id"].isin(aligned)]
+    authors = names.merge(ids, on=["paper_id", "position"], how="left")
+    key = authors["auid"].astype(object).where(authors["auid"].notna(), "name:" + authors["name"])
+    authors["author_id"], _ = intern(key, "author_id", "key")
+    tables["paper_authors"] = authors[["paper_id", "author_id", "position"]]
+    tables["dim_authors"] = (
+        authors.groupby("author_id", sort=True)
+        .agg(auid=("auid", "first"), name=("name", "first"))
+        .reset_index()
+    )
+
+    subjects = explode_list(papers["subject_areas_str"], "subject")
+    subjects["subject_id"], tables["dim_subjects"] = intern(
+        subjects["subject"], "subject_id", "subject")
+    tables["paper_subjects"] = subjects[["paper_id", "subject_id", "position"]]
+
+    countries = explode_list(papers["countries_str"], "country")
+    countries["country_id"], tables["dim_countries"] = intern(
+        countries["country"], "country_id", "country")
+    tables["paper_countries"] = countries[["paper_id", "country_id"]]
+
+    return tables
+
+
+def write_link_tables(papers: pd.DataFrame, fmt: str = "csv"):
+    """Build and write all tables from the saved papers file's contents.
+
+    Returns the written paths."""
+    written = []
+    for name, df in build_link_tables(papers).items():
+        written += write_table(df, table_path(name), fmt)
+    with open(STAMP_PATH, "w", encoding="utf-8") as f:
+        json.dump(papers_stamp(), f, indent=2)
+    return written + [STAMP_PATH]
+
+
+def count_papers_by(link: str, dim: str, id_col: str, label_col: str) -> pd.Series:
+    """Number of link rows per dimension label, largest first.
+
+    E.g. count_papers_by("paper_subjects", "dim_subjects", "subject_id",
+    "subject") gives papers per subject area."""
+    ids = read_link_table(link, columns=[id_col])[id_col]
+    labels = read_link_table(dim).set_index(id_col)[label_col]
+    counts = ids.value_counts()
+    counts.index = labels.reindex(counts.index).values
+    counts.index.name = label_col
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the link tables from papers_all_years.")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="storage: CSV, typed Parquet, or both")
+    args = parser.parse_args()
+
+    papers = read_table(PAPERS_PATH, columns=SOURCE_COLUMNS)
+    for out in write_link_tables(papers, args.format):
+        print("Saved to", out)
+
+
+if __name__ == "__main__":
+    main()
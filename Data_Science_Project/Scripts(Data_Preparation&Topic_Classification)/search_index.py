@@ -0,0 +1,176 @@
+"""BM25 full-text index over the titles and abstracts of topic_clustered.
+
+`python search_index.py` tokenizes every paper once and writes
+search_index/:
+
+    postings_indptr.npy   int64, term t's postings are [indptr[t], indptr[t+1])
+    postings_docs.npy     int32 document number of each posting
+    postings_weights.npy  float32 BM25 weight of the term in that document
+    vocabulary.json       term -> term number
+    eids.csv              eid of each document number
+    meta.json             BM25 parameters and sizes
+
+Title words count `--title-weight` times. The BM25 weight of every
+(term, document) pair is computed at build time, so a query only adds up
+the postings of its terms:
+
+    index = SearchIndex.load()
+    docs, scores = index.search("graph neural network", k=20)
+    index.eids[docs]
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from table_io import read_table
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CLUSTER_PATH = PROJECT_ROOT / "topic_clustered.csv"
+INDEX_DIR = PROJECT_ROOT / "search_index"
+
+
+class EidLookup:
+    """Positions of eids in a sequence that may repeat some of them.
+
+    A repeated eid maps to its first position; pd.Index.get_indexer alone
+    refuses non-unique indexes."""
+
+    def __init__(self, eids):
+        keys = pd.Index(eids)
+        first = ~keys.duplicated()
+        self._keys = keys[first]
+        self._positions = np.flatnonzero(first)
+
+    def positions(self, eids) -> np.ndarray:
+        """Position of each eid, -1 if it is not in the sequence."""
+        pos = self._keys.get_indexer(eids)
+        return np.where(pos >= 0, self._positions[pos], -1)
+
+
+def make_vectorizer(vocabulary=None) -> CountVectorizer:
+    return CountVectorizer(stop_words="english", vocabulary=vocabulary, dtype=np.float32)
+
+
+def build_index(eids, titles, abstracts, k1=1.2, b=0.75, title_weight=2.0,
+                out_dir: Path = INDEX_DIR) -> Path:
+    titles = pd.Series(titles).fillna("").astype(str)
+    abstracts = pd.Series(abstracts).fillna("").astype(str)
+
+    vectorizer = make_vectorizer()
+    vectorizer.fit(titles + " " + abstracts)
+    tf = (title_weight * vectorizer.transform(titles) + vectorizer.transform(abstracts)).tocsr()
+
+    n_docs = tf.shape[0]
+    doc_len = np.asarray(tf.sum(axis=1)).ravel()
+    avg_len = doc_len.mean() if n_docs else 0.0
+    doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    # BM25 weight of each (document, term) entry
+    rows = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+    norm = k1 * (1 - b + b * doc_len[rows] / avg_len) if avg_len else k1
+    tf.data = (idf[tf.indices] * tf.data * (k1 + 1) / (tf.data + norm)).astype(np.float32)
+
+    postings = tf.T.tocsr()
+    postings.sort_indices()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "postings_indptr.npy", postings.indptr.astype(np.int64))
+    np.save(out_dir / "postings_docs.npy", postings.indices.astype(np.int32))
+    np.save(out_dir / "postings_weights.npy", postings.data.astype(np.float32))
+    vocabulary = {term: int(i) for term, i in vectorizer.vocabulary_.items()}
+    with open(out_dir / "vocabulary.json", "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f, ensure_ascii=False)
+    pd.Series(eids, name="eid").to_csv(out_dir / "eids.csv", index=False)
+    meta = {"n_docs": int(n_docs), "n_terms": len(vocabulary), "n_postings": int(postings.nnz),
+            "k1": k1, "b": b, "title_weight": title_weight}
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+class SearchIndex:
+    """Memory-mapped BM25 postings with ranked, optionally filtered search."""
+
+    def __init__(self, indptr, docs, weights, vocabulary: dict, eids, meta=None):
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+        self.vocabulary = vocabulary
+        self.eids = np.asarray(eids)
+        self.meta = meta or {}
+        self.lookup = EidLookup(self.eids)
+        self._analyzer = make_vectorizer().build_analyzer()
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR, mmap: bool = True):
+        index_dir = Path(index_dir)
+        mode = "r" if mmap else None
+        with open(index_dir / "vocabulary.json", encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        with open(index_dir / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(
+            np.load(index_dir / "postings_indptr.npy", mmap_mode=mode),
+            np.load(index_dir / "postings_docs.npy", mmap_mode=mode),
+            np.load(index_dir / "postings_weights.npy", mmap_mode=mode),
+            vocabulary,
+            pd.read_csv(index_dir / "eids.csv")["eid"].to_numpy(),
+            meta,
+        )
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.eids)
+
+    def terms(self, query: str):
+        """Indexed term numbers of a query, tokenized like the documents."""
+        return sorted({self.vocabulary[t] for t in self._analyzer(query) if t in self.vocabulary})
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query."""
+        out = np.zeros(self.n_docs, dtype=np.float32)
+        for t in self.terms(query):
+            start, end = self.indptr[t], self.indptr[t + 1]
+            out[self.docs[start:end]] += self.weights[start:end]
+        return out
+
+    def search(self, query: str, k: int = 50, mask=None):
+        """Top-k (document numbers, scores), best first.
+
+        `mask` is an optional boolean array over documents, e.g. a topic or
+        year filter; only documents matching at least one term are returned."""
+        scores = self.scores(query)
+        hits = scores > 0
+        if mask is not None:
+            hits &= mask
+        docs = np.flatnonzero(hits)
+        if len(docs) > k:
+            docs = docs[np.argpartition(-scores[docs], k - 1)[:k]]
+        docs = docs[np.lexsort((docs, -scores[docs]))]
+        return docs, scores[docs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the BM25 search index of topic_clustered.")
+    parser.add_argument("--k1", type=float, default=1.2, help="BM25 term saturation")
+    parser.add_argument("--b", type=float, default=0.75, help="BM25 length normalization")
+    parser.add_argument("--title-weight", type=float, default=2.0,
+                        help="how many times a title word counts")
+    args = parser.parse_args()
+
+    df = read_table(CLUSTER_PATH, columns=["eid", "title", "abstract"]).drop_duplicates("eid")
+    out = build_index(df["eid"], df["title"], df["abstract"], args.k1, args.b, args.title_weight)
+
+    index = SearchIndex.load(out)
+    print(f"{index.n_docs} documents, {index.meta['n_terms']} terms, "
+          f"{index.meta['n_postings']} postings")
+    print("Saved to", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Nearest-neighbour "similar papers" index.
+
+`python similar_papers.py` reduces the cached TF-IDF matrix of the
+abstracts (tfidf_cache.py) to dense vectors with truncated SVD (LSA),
+L2-normalizes them and finds every paper's exact top-k neighbours by
+cosine similarity, one block of rows at a time. It writes
+similar_papers/:
+
+    vectors.npy         float32 n x dims unit vectors
+    neighbors.npy       int32 n x k row numbers of the nearest papers
+    neighbor_scores.npy float32 n x k cosine similarities
+    eids.csv            eid of each row
+    projection.joblib   TF-IDF vectorizer + SVD, to embed free text
+    meta.json           sizes and parameters
+
+Other vectors aligned with a list of eids, such as sentence embeddings
+of the titles, can be indexed the same way with build_index().
+
+    index = SimilarPapers.load()
+    index.similar("2-s2.0-85012345678", k=10)   # precomputed lookup
+    index.query_text("graph neural networks")  # one matrix-vector product
+"""
+import argparse
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from search_index import EidLookup
+from tfidf_cache import cached_tfidf
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CSV_PATH = PROJECT_ROOT / "topic_data.csv"
+INDEX_DIR = PROJECT_ROOT / "similar_papers"
+
+
+def top_k_blocked(vectors: np.ndarray, k: int, block_size: int = 1024):
+    """Exact k nearest rows of every row by dot product, excluding itself.
+
+    Computes one block_size x n similarity block at a time, so memory is
+    bounded by block_size * n floats. Returns (indices, scores), best first."""
+    n = len(vectors)
+    k = max(min(k, n - 1), 0)
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+    for start in range(0, n, block_size):
+        end = min(start + block_size, n)
+        sim = vectors[start:end] @ vectors.T
+        sim[np.arange(end - start), np.arange(start, end)] = -np.inf
+        top = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+        top_sim = np.take_along_axis(sim, top, axis=1)
+        order = np.argsort(-top_sim, axis=1, kind="stable")
+        indices[start:end] = np.take_along_axis(top, order, axis=1)
+        scores[start:end] = np.take_along_axis(top_sim, order, axis=1)
+    return indices, scores
+
+
+def build_index(vectors, eids, k: int = 20, block_size: int = 1024, projection=None,
+                meta=None, out_dir: Path = INDEX_DIR) -> Path:
+    """Normalize `vectors` (one row per eid), find neighbours and save."""
+    vectors = normalize(np.asarray(vectors, dtype=np.float32))
+    neighbors, scores = top_k_blocked(vectors, k, block_size)
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    np.save(out_dir / "vectors.npy", vectors)
+    np.save(out_dir / "neighbors.npy", neighbors)
+    np.save(out_dir / "neighbor_scores.npy", scores)
+    pd.Series(eids, name="eid").to_csv(out_dir / "eids.csv", index=False)
+    if projection is not None:
+        joblib.dump(projection, out_dir / "projection.joblib")
+    meta = {"n_papers": len(vectors), "dims": vectors.shape[1], "k": neighbors.shape[1],
+            **(meta or {})}
+    with open(out_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+class SimilarPapers:
+    """Precomputed neighbours plus memory-mapped vectors for new queries."""
+
+    def __init__(self, vectors, neighbors, scores, eids, projection=None, meta=None):
+        self.vectors = vectors
+        self.neighbors = neighbors
+        self.scores = scores
+        self.eids = np.asarray(eids)
+        self.projection = projection
+        self.meta = meta or {}
+        self.lookup = EidLookup(self.eids)
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR, mmap: bool = True):
+        index_dir = Path(index_dir)
+        mode = "r" if mmap else None
+        with open(index_dir / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        projection = None
+        if (index_dir / "projection.joblib").exists():
+            projection = joblib.load(index_dir / "projection.joblib")
+        return cls(
+            np.load(index_dir / "vectors.npy", mmap_mode=mode),
+            np.load(index_dir / "neighbors.npy", mmap_mode=mode),
+            np.load(index_dir / "neighbor_scores.npy", mmap_mode=mode),
+            pd.read_csv(index_dir / "eids.csv")["eid"].to_numpy(),
+            projection,
+            meta,
+        )
+
+    def row_of(self, eid) -> int:
+        """Row number of a paper, or -1 if it is not indexed."""
+        return int(self.lookup.positions([eid])[0])
+
+    def neighbors_of(self, eid, k: int = 10):
+        """(rows, similarities) of the k nearest papers, best first; empty if
+        the paper is not indexed."""
+        row = self.row_of(eid)
+        if row < 0:
+            return np.array([], dtype=np.int32), np.array([], dtype=np.float32)
+        k = min(k, self.neighbors.shape[1])
+        return np.asarray(self.neighbors[row, :k]), np.asarray(self.scores[row, :k])
+
+    def similar(self, eid, k: int = 10) -> pd.DataFrame:
+        """The k most similar indexed papers to one indexed paper."""
+        rows, scores = self.neighbors_of(eid, k)
+        return pd.DataFrame({"eid": self.eids[rows], "similarity": scores})
+
+    def query_vector(self, vector, k: int = 10) -> pd.DataFrame:
+        """The k papers closest to an arbitrary vector in the index space."""
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        sim = np.asarray(self.vectors @ vector)
+        k = min(k, len(sim))
+        top = np.argpartition(-sim, k - 1)[:k] if k else np.array([], dtype=int)
+        top = top[np.argsort(-sim[top], kind="stable")]
+        return pd.DataFrame({"eid": self.eids[top], "similarity": sim[top]})
+
+    def query_text(self, text: str, k: int = 10) -> pd.DataFrame:
+        """The k papers closest to a piece of text (needs the projection)."""
+        if self.projection is None:
+            raise ValueError("This index was built without a text projection")
+        vectorizer, svd = self.projection["vectorizer"], self.projection["svd"]
+        return self.query_vector(svd.transform(vectorizer.transform([text]))[0], k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the similar-papers index.")
+    parser.add_argument("--dims", type=int, default=256, help="SVD dimensions of the vectors")
+    parser.add_argument("--k", type=int, default=20, help="neighbours stored per paper")
+    parser.add_argument("--block-size", type=int, default=1024,
+                        help="rows per similarity block (memory: block x papers floats)")
+    args = parser.parse_args()
+
+    X, vectorizer, eids = cached_tfidf(CSV_PATH, 20000)
+    keep = ~eids.duplicated().to_numpy()
+    X, eids = X[keep], eids[keep]
+    dims = min(args.dims, X.shape[1] - 1)
+    svd = TruncatedSVD(n_components=dims, random_state=42)
+    vectors = svd.fit_transform(X)
+    print(f"LSA vectors: {X.shape[0]} papers x {dims} dims, "
+          f"{svd.explained_variance_ratio_.sum():.1%} of the TF-IDF variance")
+
+    out = build_index(vectors, eids, args.k, args.block_size,
+                      projection={"vectorizer": vectorizer, "svd": svd},
+                      meta={"source": "tfidf-lsa", "tfidf_max_features": 20000})
+    print("Saved to", out)
+
+
+if __name__ == "__main__":
+    main()
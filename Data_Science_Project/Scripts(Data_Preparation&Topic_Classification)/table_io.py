@@ -0,0 +1,164 @@
+"""Read and write the project's tables as CSV or typed Parquet.
+
+Every dataset keeps its CSV name (e.g. papers_all_years.csv); the Parquet
+copy sits next to it with a .parquet suffix. Readers take whichever of
+the two was written last, so switching formats never serves stale data.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+FORMATS = ["csv", "parquet", "both"]
+
+# Types used in the Parquet files. "category" columns are stored as
+# dictionary-encoded strings.
+COLUMN_TYPES = {
+    "year": "Int16",
+    "citedby_count": "Int32",
+    "cluster": "Int16",
+    "is_Q1": "Int8",
+    "journal": "category",
+    "countries_str": "category",
+    "SJR Best Quartile": "category",
+}
+
+
+def parquet_path(path: Path) -> Path:
+    return Path(path).with_suffix(".parquet")
+
+
+def prefers_parquet(path: Path) -> bool:
+    """True when the Parquet copy exists and is at least as new as the CSV."""
+    path = Path(path)
+    pq = parquet_path(path)
+    return pq.exists() and (not path.exists() or pq.stat().st_mtime >= path.stat().st_mtime)
+
+
+def table_mtime(path: Path) -> float:
+    """mtime of the copy read_table() would load; use it as a cache key."""
+    path = Path(path)
+    return (parquet_path(path) if prefers_parquet(path) else path).stat().st_mtime
+
+
+def to_typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of df with the COLUMN_TYPES applied."""
+    df = df.copy()
+    for col, dtype in COLUMN_TYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith("Int"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def write_table(df: pd.DataFrame, path: Path, fmt: str = "csv"):
+    """Write df as CSV, Parquet or both. Returns the written paths."""
+    written = []
+    if fmt in ("csv", "both"):
+        df.to_csv(path, index=False)
+        written.append(Path(path))
+    if fmt in ("parquet", "both"):
+        out = parquet_path(path)
+        to_typed(df).to_parquet(out, index=False)
+        written.append(out)
+    return written
+
+
+def arrow_schema(columns):
+    """Fixed Parquet schema for `columns`, so every batch has the same types."""
+    import pyarrow as pa
+
+    arrow_types = {
+        "Int8": pa.int8(),
+        "Int16": pa.int16(),
+        "Int32": pa.int32(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+    }
+    return pa.schema(
+        [(col, arrow_types.get(COLUMN_TYPES.get(col), pa.string())) for col in columns]
+    )
+
+
+class BatchWriter:
+    """Append record batches to a dataset without holding it in memory.
+
+    Each write() goes straight to the CSV file and/or a Parquet row group,
+    so peak memory is bounded by the batch size, not the dataset size.
+    """
+
+    def __init__(self, path: Path, columns, fmt: str = "csv"):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.rows = 0
+        self._csv_started = False
+        self._parquet = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        df = df.reindex(columns=self.columns)
+        if self.fmt in ("csv", "both"):
+            df.to_csv(self.path, index=False, mode="a" if self._csv_started else "w",
+                      header=not self._csv_started)
+            self._csv_started = True
+        if self.fmt in ("parquet", "both"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            typed = to_typed(df)
+            if self._parquet is None:
+                # keep the pandas metadata so nullable ints read back as Int16/Int32
+                pandas_meta = pa.Schema.from_pandas(typed, preserve_index=False).metadata
+                self._schema = arrow_schema(self.columns).with_metadata(pandas_meta)
+                self._parquet = pq.ParquetWriter(parquet_path(self.path), self._schema)
+            table = pa.Table.from_pandas(typed, schema=self._schema, preserve_index=False)
+            self._parquet.write_table(table)
+        self.rows += len(df)
+
+    def close(self):
+        """Finish the files. Returns the written paths."""
+        if self.rows == 0:
+            self.write(pd.DataFrame(columns=self.columns))
+        written = []
+        if self._csv_started:
+            written.append(self.path)
+        if self._parquet is not None:
+            self._parquet.close()
+            written.append(parquet_path(self.path))
+        return written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_table(path: Path, columns=None, **csv_kwargs) -> pd.DataFrame:
+    """Load a dataset, reading only `columns` when given.
+
+    Uses the Parquet copy when it exists and is at least as new as the CSV.
+    """
+    path = Path(path)
+    if prefers_parquet(path):
+        return pd.read_parquet(parquet_path(path), columns=columns)
+    return pd.read_csv(path, usecols=columns, **csv_kwargs)
+
+
+def iter_table(path: Path, columns=None, chunksize: int = 100_000):
+    """Yield a dataset as DataFrames of at most `chunksize` rows.
+
+    Picks the CSV or Parquet copy like read_table; memory is bounded by the
+    chunk size.
+    """
+    path = Path(path)
+    if prefers_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(parquet_path(path)).iter_batches(
+                batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
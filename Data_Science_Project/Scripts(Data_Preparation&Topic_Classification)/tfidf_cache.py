@@ -0,0 +1,77 @@
+"""On-disk cache of the TF-IDF matrix of the topic abstracts.
+
+topic_kmeans.py fits TfidfVectorizer on every abstract of topic_data. The
+fitted vectorizer (with its vocabulary) and the sparse matrix are kept in
+topic_tfidf/:
+
+    matrix.npz         scipy sparse CSR, one row per abstract
+    vectorizer.joblib  the fitted TfidfVectorizer
+    eids.csv           eid of each row
+    meta.json          source file size/mtime and vectorizer parameters
+
+and reused until topic_data or the parameters change.
+"""
+import json
+from pathlib import Path
+
+import joblib
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from table_io import parquet_path, prefers_parquet, read_table
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TFIDF_DIR = PROJECT_ROOT / "topic_tfidf"
+MATRIX_PATH = TFIDF_DIR / "matrix.npz"
+
+
+def source_signature(path: Path) -> dict:
+    """Identify the copy of a dataset read_table would load."""
+    path = Path(path)
+    src = parquet_path(path) if prefers_parquet(path) else path
+    stat = src.stat()
+    return {"file": src.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_abstracts(path: Path) -> pd.DataFrame:
+    """eid and abstract of every paper with an abstract, in file order."""
+    df = read_table(path, columns=["eid", "abstract"]).dropna(subset=["abstract"])
+    df["abstract"] = df["abstract"].astype(str)
+    return df
+
+
+def cached_tfidf(path: Path, max_features: int = 20000, docs: pd.DataFrame = None,
+                 cache_dir: Path = TFIDF_DIR):
+    """Return (X, vectorizer, eids) for the abstracts in `path`.
+
+    Loads the cache when it was built from the same file with the same
+    parameters; otherwise fits the vectorizer on `docs` (eid, abstract),
+    or on the file when docs is None, and rewrites the cache."""
+    cache_dir = Path(cache_dir)
+    meta = {"source": source_signature(path), "max_features": max_features,
+            "stop_words": "english"}
+    meta_path = cache_dir / "meta.json"
+    if meta_path.exists():
+        with open(meta_path, encoding="utf-8") as f:
+            if json.load(f) == meta:
+                eids = pd.read_csv(cache_dir / "eids.csv")["eid"]
+                if docs is None or eids.equals(docs["eid"].reset_index(drop=True)):
+                    return (sparse.load_npz(cache_dir / "matrix.npz"),
+                            joblib.load(cache_dir / "vectorizer.joblib"), eids)
+
+    if docs is None:
+        docs = load_abstracts(path)
+    vectorizer = TfidfVectorizer(max_features=max_features, stop_words="english")
+    X = vectorizer.fit_transform(docs["abstract"]).tocsr()
+    vectorizer.stop_words_ = None  # only kept for introspection, not needed to transform
+    eids = docs["eid"].reset_index(drop=True)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    meta_path.unlink(missing_ok=True)
+    sparse.save_npz(cache_dir / "matrix.npz", X)
+    joblib.dump(vectorizer, cache_dir / "vectorizer.joblib")
+    eids.to_frame().to_csv(cache_dir / "eids.csv", index=False)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return X, vectorizer, eids
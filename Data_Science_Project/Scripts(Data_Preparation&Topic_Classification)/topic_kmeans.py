@@ -1,54 +1,359 @@
+import argparse
+import os
+import time
+from collections import Counter
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import normalize
+
+from table_io import COLUMN_TYPES, FORMATS, BatchWriter, iter_table, parquet_path, read_table, write_table
+from tfidf_cache import MATRIX_PATH, cached_tfidf
+from topic_model import load_model, match_clusters, previous_labels, save_model
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CSV_PATH = PROJECT_ROOT / "topic_data.csv"
+OUTPUT_PATH = PROJECT_ROOT / "topic_clustered.csv"
+SWEEP_PATH = PROJECT_ROOT / "topic_k_sweep.csv"
+
+top_n = 15
 
-df = pd.read_csv(CSV_PATH)
-df = df.dropna(subset=["abstract"])
-df["abstract"] = df["abstract"].astype(str)
-df["year"] = df["year"].astype(str)
 
-vectorizer = TfidfVectorizer(max_features=20000, stop_words="english")
-X = vectorizer.fit_transform(df["abstract"])
+def normalize_year(year: pd.Series) -> pd.Series:
+    """Years as nullable Int16, however the chunk stored them (int, float
+    with gaps, text or Int16 from Parquet)."""
+    return pd.to_numeric(year, errors="coerce").astype(COLUMN_TYPES["year"])
 
-k = 10
-kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-cluster_labels = kmeans.fit_predict(X)
 
-df["cluster"] = cluster_labels
+def clean(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.dropna(subset=["abstract"]).copy()
+    df["abstract"] = df["abstract"].astype(str)
+    df["year"] = normalize_year(df["year"])
+    return df
 
-feature_names = vectorizer.get_feature_names_out()
-top_n = 15
-topics = []
-
-for i in range(k):
-    center = kmeans.cluster_centers_[i]
-    top_indices = center.argsort()[::-1][:top_n]
-    top_words = [feature_names[j] for j in top_indices]
-    topics.append(top_words)
-    print(f"Cluster {i}: {', '.join(top_words)}")
-
-cluster_counts = df["cluster"].value_counts().sort_index()
-print("\nCluster sizes:")
-print(cluster_counts)
-
-plt.figure()
-cluster_counts.plot(kind="bar")
-plt.title("Number of Papers per Cluster")
-plt.xlabel("Cluster")
-plt.ylabel("Count")
-plt.tight_layout()
-plt.show()
-
-topic_by_year = df.groupby(["year", "cluster"])["eid"].count().unstack(fill_value=0)
-print("\nPapers per year per cluster:")
-print(topic_by_year)
-
-output_csv = PROJECT_ROOT / "topic_clustered.csv"
-df.to_csv(output_csv, index=False)
-print("\nSaved clustered data to", output_csv)
\ No newline at end of file
+
+def cluster_in_memory(k):
+    """TF-IDF over all abstracts and full-batch K-Means.
+
+    Returns (clustered frame, top terms per cluster ID)."""
+    df = clean(read_table(CSV_PATH))
+    X, vectorizer, _ = cached_tfidf(CSV_PATH, 20000, docs=df[["eid", "abstract"]])
+
+    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
+    labels = kmeans.fit_predict(X)
+    cluster_ids = match_clusters(previous_labels(OUTPUT_PATH, df["eid"]), labels, k)
+    df["cluster"] = cluster_ids[labels]
+
+    feature_names = vectorizer.get_feature_names_out()
+    topics = {}
+    for i in range(k):
+        center = kmeans.cluster_centers_[i]
+        top_indices = center.argsort()[::-1][:top_n]
+        topics[int(cluster_ids[i])] = [feature_names[j] for j in top_indices]
+
+    path = save_model(vectorizer, kmeans.cluster_centers_, cluster_ids, topics,
+                      {"mode": "tfidf", "n_docs": len(df), "max_features": 20000})
+    print("Saved topic model to", path)
+    return df, topics
+
+
+def iter_abstracts(chunksize):
+    for chunk in iter_table(CSV_PATH, chunksize=chunksize):
+        chunk = clean(chunk)
+        if len(chunk):
+            yield chunk
+
+
+def cluster_streaming(args):
+    """Hashed TF-IDF and mini-batch K-Means, one chunk of abstracts at a time.
+
+    Three passes over topic_data: document frequencies for the IDF weights,
+    `--epochs` rounds of mini-batch K-Means updates, and the assignment,
+    which streams topic_clustered to disk. Memory is bounded by the chunk
+    size plus the k x n_features centres. Hash buckets have no names, so
+    each top bucket is reported by the most frequent word hashed into it.
+
+    Returns (cluster counts, papers per year per cluster, top terms)."""
+    hasher = HashingVectorizer(n_features=args.n_features, stop_words="english",
+                               alternate_sign=False, norm=None)
+
+    n_docs = 0
+    doc_freq = np.zeros(args.n_features)
+    for chunk in iter_abstracts(args.chunksize):
+        X = hasher.transform(chunk["abstract"])
+        doc_freq += np.bincount(X.indices, minlength=args.n_features)
+        n_docs += X.shape[0]
+    # same smoothing as TfidfVectorizer
+    idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+
+    def tfidf(texts):
+        return normalize(hasher.transform(texts).multiply(idf).tocsr())
+
+    # seed the centres with a full K-Means (n_init=10) on the first
+    # --init-size abstracts; a single k-means++ draw on one mini-batch
+    # easily splits a topic and merges two others
+    sample, sample_eids = [], []
+    for chunk in iter_abstracts(args.chunksize):
+        chunk = chunk.iloc[:args.init_size - len(sample_eids)]
+        sample.append(tfidf(chunk["abstract"]))
+        sample_eids.extend(chunk["eid"])
+        if len(sample_eids) >= args.init_size:
+            break
+    sample = sparse.vstack(sample).tocsr()
+    init = KMeans(n_clusters=args.k, random_state=42, n_init=10).fit(sample)
+    kmeans = MiniBatchKMeans(n_clusters=args.k, init=init.cluster_centers_, n_init=1,
+                             random_state=42, batch_size=args.batch_size)
+
+    for epoch in range(args.epochs):
+        for chunk in iter_abstracts(args.chunksize):
+            X = tfidf(chunk["abstract"])
+            for start in range(0, X.shape[0], args.batch_size):
+                kmeans.partial_fit(X[start:start + args.batch_size])
+        print(f"Epoch {epoch + 1}/{args.epochs} done")
+
+    # stable IDs, matched on the seed sample against the previous labels
+    cluster_ids = match_clusters(previous_labels(OUTPUT_PATH, sample_eids),
+                                 kmeans.predict(sample), args.k)
+
+    centers = kmeans.cluster_centers_
+    top_buckets = np.argsort(-centers, axis=1)[:, :top_n]
+    wanted = set(top_buckets.ravel().tolist())
+    analyzer = hasher.build_analyzer()
+    bucket_words = {b: Counter() for b in wanted}
+
+    counts = Counter()
+    by_year = Counter()
+    columns = None
+    writer = None
+    try:
+        for chunk in iter_abstracts(args.chunksize):
+            chunk["cluster"] = cluster_ids[kmeans.predict(tfidf(chunk["abstract"]))]
+            if writer is None:
+                columns = list(chunk.columns)
+                writer = BatchWriter(OUTPUT_PATH, columns, args.format)
+            writer.write(chunk)
+            counts.update(chunk["cluster"].tolist())
+            dated = chunk[chunk["year"].notna()]
+            by_year.update(zip(dated["year"].tolist(), dated["cluster"].tolist()))
+
+            words = Counter(w for text in chunk["abstract"] for w in analyzer(text))
+            vocab = list(words)
+            if vocab:
+                buckets = hasher.transform(vocab).indices
+                for word, b in zip(vocab, buckets):
+                    if b in bucket_words:
+                        bucket_words[b][word] += words[word]
+    finally:
+        if writer is not None:
+            for out in writer.close():
+                print("\nSaved clustered data to", out)
+
+    topics = {
+        int(cluster_ids[i]): [bucket_words[b].most_common(1)[0][0] if bucket_words[b] else f"#{b}"
+                              for b in row]
+        for i, row in enumerate(top_buckets)
+    }
+    path = save_model(hasher, centers, cluster_ids, topics,
+                      {"mode": "hashing", "n_docs": n_docs, "n_features": args.n_features},
+                      idf=idf)
+    print("Saved topic model to", path)
+    cluster_counts = pd.Series(counts, dtype=int).sort_index()
+    topic_by_year = (
+        pd.Series(by_year, dtype=int)
+        .rename_axis(["year", "cluster"])
+        .unstack(fill_value=0)
+        .sort_index()
+    )
+    return cluster_counts, topic_by_year, topics
+
+
+def assign_new(args):
+    """Label abstracts that are not in topic_clustered yet with the saved model.
+
+    Reads topic_data in chunks and transforms only the new abstracts, so a
+    daily update costs one vectorizer transform and one product with the
+    centres. Returns (model, newly labelled frame)."""
+    model = load_model()
+    print(f"Topic model v{model.version:03d} ({model.meta.get('mode')})")
+
+    existing = None
+    seen = set()
+    if OUTPUT_PATH.exists() or parquet_path(OUTPUT_PATH).exists():
+        existing = read_table(OUTPUT_PATH)
+        existing["year"] = normalize_year(existing["year"])
+        seen = set(existing["eid"])
+
+    new = []
+    for chunk in iter_abstracts(args.chunksize):
+        chunk = chunk[~chunk["eid"].isin(seen)].copy()
+        if len(chunk):
+            chunk["cluster"] = model.predict(chunk["abstract"])
+            new.append(chunk)
+    new = pd.concat(new, ignore_index=True) if new else pd.DataFrame()
+
+    if len(new):
+        out = new if existing is None else pd.concat(
+            [existing, new[existing.columns]], ignore_index=True)
+        for path in write_table(out, OUTPUT_PATH, args.format):
+            print("Saved clustered data to", path)
+    return model, new
+
+
+_sweep_matrix = None
+
+
+def _init_sweep_worker(matrix_path):
+    global _sweep_matrix
+    from threadpoolctl import threadpool_limits
+
+    # one BLAS/OpenMP thread per process; the sweep is parallel across k
+    threadpool_limits(1)
+    _sweep_matrix = sparse.load_npz(matrix_path)
+
+
+def score_k(n_clusters, silhouette_sample):
+    """Fit K-Means with n_clusters on the cached matrix and score it, the
+    silhouette on at most silhouette_sample abstracts."""
+    X = _sweep_matrix
+    start = time.perf_counter()
+    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10).fit(X)
+    sample = min(silhouette_sample, X.shape[0])
+    return {
+        "k": n_clusters,
+        "inertia": kmeans.inertia_,
+        "silhouette": silhouette_score(X, kmeans.labels_, sample_size=sample, random_state=42),
+        "smallest_cluster": int(np.bincount(kmeans.labels_).min()),
+        "n_iter": kmeans.n_iter_,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def sweep_k(args):
+    """Score a range of k in parallel on the cached TF-IDF matrix."""
+    X, _, _ = cached_tfidf(CSV_PATH, 20000)
+    k_min, k_max = args.sweep
+    ks = list(range(max(2, k_min), min(k_max, X.shape[0] - 1) + 1, args.k_step))
+    if not ks:
+        raise SystemExit(f"No k in {k_min}..{k_max} to sweep: k must be in 2..{X.shape[0] - 1} "
+                         f"for {X.shape[0]} abstracts")
+    print(f"TF-IDF matrix: {X.shape[0]} abstracts x {X.shape[1]} terms, "
+          f"sweeping k = {ks[0]}..{ks[-1]} on {args.workers} workers")
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_sweep_worker,
+                                 initargs=(MATRIX_PATH,)) as executor:
+            rows = list(executor.map(score_k, ks, repeat(args.silhouette_sample)))
+    else:
+        _init_sweep_worker(MATRIX_PATH)
+        rows = [score_k(n, args.silhouette_sample) for n in ks]
+    return pd.DataFrame(rows)
+
+
+def report(cluster_counts, topic_by_year, topics):
+    for i, top_words in sorted(topics.items()):
+        print(f"Cluster {i}: {', '.join(top_words)}")
+
+    print("\nCluster sizes:")
+    print(cluster_counts)
+
+    plt.figure()
+    cluster_counts.plot(kind="bar")
+    plt.title("Number of Papers per Cluster")
+    plt.xlabel("Cluster")
+    plt.ylabel("Count")
+    plt.tight_layout()
+    plt.show()
+
+    print("\nPapers per year per cluster:")
+    print(topic_by_year)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Cluster abstracts into topics with TF-IDF + K-Means.")
+    parser.add_argument("--format", choices=FORMATS, default="csv",
+                        help="storage for topic_clustered: CSV, typed Parquet, or both")
+    parser.add_argument("--k", type=int, default=10, help="number of topic clusters")
+    parser.add_argument("--sweep", type=int, nargs=2, metavar=("K_MIN", "K_MAX"),
+                        help="score every k in K_MIN..K_MAX on the cached TF-IDF matrix "
+                             "instead of fitting a model")
+    parser.add_argument("--k-step", type=int, default=1, help="step between swept k values")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes of the k sweep")
+    parser.add_argument("--silhouette-sample", type=int, default=5000,
+                        help="abstracts sampled for the silhouette score of the k sweep")
+    parser.add_argument("--assign", action="store_true",
+                        help="assign-only mode: label the abstracts missing from topic_clustered "
+                             "with the latest saved topic model, without refitting")
+    parser.add_argument("--streaming", action="store_true",
+                        help="out-of-core mode: hashed TF-IDF features and mini-batch K-Means "
+                             "over topic_data read in chunks")
+    parser.add_argument("--chunksize", type=int, default=20000,
+                        help="abstracts read per chunk in streaming mode")
+    parser.add_argument("--batch-size", type=int, default=2048,
+                        help="mini-batch size of the K-Means updates in streaming mode")
+    parser.add_argument("--epochs", type=int, default=3,
+                        help="passes of mini-batch updates over the data in streaming mode")
+    parser.add_argument("--init-size", type=int, default=10000,
+                        help="abstracts used to seed the centres in streaming mode")
+    parser.add_argument("--n-features", type=int, default=2 ** 18,
+                        help="hash buckets of the streaming vectorizer")
+    return parser
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.sweep and args.sweep[0] > args.sweep[1]:
+        parser.error("--sweep K_MIN must not be greater than K_MAX")
+    if args.k_step < 1:
+        parser.error("--k-step must be at least 1")
+
+    if args.assign:
+        model, new = assign_new(args)
+        print(f"Assigned {len(new)} new abstracts")
+        if len(new):
+            counts = new["cluster"].value_counts().sort_index()
+            print(counts.rename(index=lambda c: f"{c} {model.names.get(c, '')}").to_string())
+        return
+
+    if args.sweep:
+        result = sweep_k(args)
+        print(result.to_string(index=False, float_format=lambda x: f"{x:,.4f}"))
+        result.to_csv(SWEEP_PATH, index=False)
+        print("\nSaved k sweep to", SWEEP_PATH)
+
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
+        ax1.plot(result["k"], result["inertia"], marker="o")
+        ax1.set_title("Inertia (elbow)")
+        ax1.set_xlabel("k")
+        ax2.plot(result["k"], result["silhouette"], marker="o")
+        ax2.set_title("Sampled silhouette")
+        ax2.set_xlabel("k")
+        plt.tight_layout()
+        plt.show()
+        return
+
+    if args.streaming:
+        cluster_counts, topic_by_year, topics = cluster_streaming(args)
+    else:
+        df, topics = cluster_in_memory(args.k)
+        cluster_counts = df["cluster"].value_counts().sort_index()
+        topic_by_year = df.groupby(["year", "cluster"])["eid"].count().unstack(fill_value=0)
+
+    report(cluster_counts, topic_by_year, topics)
+
+    if not args.streaming:
+        for out in write_table(df, OUTPUT_PATH, args.format):
+            print("\nSaved clustered data to", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Versioned topic model artifacts.
+
+topic_kmeans.py saves every fit to topic_model/v<NNN>/:
+
+    vectorizer.joblib  fitted TfidfVectorizer, or HashingVectorizer + IDF
+    centers.npy        k x n_features cluster centres
+    cluster_ids.npy    stable cluster ID of each centre row
+    topic_names.json   {"<cluster id>": "<name>"}, edit to rename topics
+    meta.json          version, mode, parameters, sizes, top terms
+
+Cluster IDs are kept stable across refits: the new clusters are matched
+to the labels in the previous topic_clustered by maximum overlap
+(Hungarian algorithm) and given those IDs, so topic names carry over.
+
+    model = load_model()             # latest version
+    model.predict(["abstract ..."])  # one sparse product, no refit
+    load_topic_names()               # {0: "Biodiversity & ...", ...}
+"""
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.optimize import linear_sum_assignment
+from sklearn.preprocessing import normalize
+
+from table_io import parquet_path, read_table
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MODEL_DIR = PROJECT_ROOT / "topic_model"
+
+# names of the clusters of the original fit, used until a model is saved
+DEFAULT_TOPIC_NAMES = {
+    0: "Biodiversity & Species Discovery",
+    1: "Catalysis & CO2 Conversion",
+    2: "Education & Social/Public Health",
+    3: "Materials Science & Adsorption",
+    4: "Cancer Biology & Drug Discovery",
+    5: "Biomedical Experiments & Genetics",
+    6: "Clinical Patient Studies",
+    7: "COVID-19 & Vaccine Research",
+    8: "Particle Physics (LHC)",
+    9: "Machine Learning & Modeling",
+}
+
+
+class TopicModel:
+    """A fitted vectorizer plus cluster centres."""
+
+    def __init__(self, vectorizer, centers, cluster_ids=None, idf=None, names=None, meta=None):
+        self.vectorizer = vectorizer
+        self.centers = np.asarray(centers)
+        if cluster_ids is None:
+            cluster_ids = np.arange(len(self.centers))
+        self.cluster_ids = np.asarray(cluster_ids)
+        self.idf = idf
+        self.names = names or {}
+        self.meta = meta or {}
+        self._center_sq = (self.centers ** 2).sum(axis=1)
+
+    @property
+    def version(self):
+        return self.meta.get("version")
+
+    def transform(self, texts):
+        """L2-normalized TF-IDF rows of `texts`."""
+        X = self.vectorizer.transform(texts)
+        if self.idf is not None:
+            X = normalize(X.multiply(self.idf).tocsr())
+        return X
+
+    def predict_features(self, X) -> np.ndarray:
+        """Cluster ID of the nearest centre of each row, like KMeans.predict."""
+        nearest = np.argmax(2 * (X @ self.centers.T) - self._center_sq, axis=1)
+        return self.cluster_ids[np.asarray(nearest).ravel()]
+
+    def predict(self, texts) -> np.ndarray:
+        return self.predict_features(self.transform(texts))
+
+
+def versions(model_dir: Path = MODEL_DIR):
+    if not Path(model_dir).exists():
+        return []
+    return sorted(int(p.name[1:]) for p in Path(model_dir).glob("v[0-9][0-9][0-9]")
+                  if (p / "meta.json").exists())
+
+
+def version_dir(version: int, model_dir: Path = MODEL_DIR) -> Path:
+    return Path(model_dir) / f"v{version:03d}"
+
+
+def load_model(version=None, model_dir: Path = MODEL_DIR) -> TopicModel:
+    """Load a saved model, the latest one by default."""
+    if version is None:
+        saved = versions(model_dir)
+        if not saved:
+            raise FileNotFoundError(f"No topic model in {model_dir}; run topic_kmeans.py first")
+        version = saved[-1]
+    path = version_dir(version, model_dir)
+    saved = joblib.load(path / "vectorizer.joblib")
+    with open(path / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    return TopicModel(saved["vectorizer"], np.load(path / "centers.npy"),
+                      np.load(path / "cluster_ids.npy"), saved.get("idf"),
+                      _read_names(path / "topic_names.json"), meta)
+
+
+def _read_names(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+
+def load_topic_names(model_dir: Path = MODEL_DIR) -> dict:
+    """Cluster ID -> topic name of the latest model (defaults before the first save)."""
+    saved = versions(model_dir)
+    if not saved:
+        return dict(DEFAULT_TOPIC_NAMES)
+    return _read_names(version_dir(saved[-1], model_dir) / "topic_names.json")
+
+
+def match_clusters(prev_labels, new_labels, k: int) -> np.ndarray:
+    """Stable ID for each new cluster, by maximum overlap with prev_labels.
+
+    Both label arrays cover the same papers; prev_labels < 0 means the
+    paper had no previous label. New clusters that match no previous one
+    get new IDs above every previous one, so a cluster that disappeared
+    never passes its ID (and topic name) on to an unrelated new cluster."""
+    prev_labels = np.asarray(prev_labels)
+    new_labels = np.asarray(new_labels)
+    known = prev_labels >= 0
+    n_prev = int(prev_labels[known].max()) + 1 if known.any() else 0
+    perm = np.full(k, -1)
+    if n_prev:
+        overlap = np.zeros((k, n_prev))
+        np.add.at(overlap, (new_labels[known], prev_labels[known]), 1)
+        rows, cols = linear_sum_assignment(-overlap)
+        matched = overlap[rows, cols] > 0
+        perm[rows[matched]] = cols[matched]
+    unmatched = perm < 0
+    perm[unmatched] = n_prev + np.arange(int(unmatched.sum()))
+    return perm
+
+
+def topic_names_for(top_terms: dict, prev_names: dict) -> dict:
+    """Names for the stable IDs: previous names, else the top terms."""
+    return {
+        cid: prev_names.get(cid, "Topic {}: {}".format(cid, ", ".join(terms[:3])))
+        for cid, terms in sorted(top_terms.items())
+    }
+
+
+def save_model(vectorizer, centers, cluster_ids, top_terms, meta: dict, idf=None, names=None,
+               model_dir: Path = MODEL_DIR) -> Path:
+    """Write a new version. `top_terms` maps cluster ID -> list of terms."""
+    saved = versions(model_dir)
+    version = saved[-1] + 1 if saved else 1
+    path = version_dir(version, model_dir)
+    path.mkdir(parents=True)
+
+    joblib.dump({"vectorizer": vectorizer, "idf": idf}, path / "vectorizer.joblib")
+    np.save(path / "centers.npy", np.asarray(centers, dtype=np.float32))
+    np.save(path / "cluster_ids.npy", np.asarray(cluster_ids, dtype=np.int64))
+    if names is None:
+        names = topic_names_for(top_terms, load_topic_names(model_dir))
+    with open(path / "topic_names.json", "w", encoding="utf-8") as f:
+        json.dump({str(k): v for k, v in sorted(names.items())}, f, indent=2, ensure_ascii=False)
+    meta = {
+        "version": version,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "n_clusters": int(len(centers)),
+        **meta,
+        "top_terms": {str(k): list(v) for k, v in sorted(top_terms.items())},
+    }
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def previous_labels(path: Path, eids) -> np.ndarray:
+    """Cluster of each eid in an existing topic_clustered table (-1 if absent)."""
+    if not (Path(path).exists() or parquet_path(path).exists()):
+        return np.full(len(eids), -1)
+    prev = read_table(path, columns=["eid", "cluster"]).drop_duplicates("eid").set_index("eid")
+    labels = pd.to_numeric(prev["cluster"], errors="coerce").reindex(pd.Index(eids))
+    return labels.fillna(-1).astype(int).to_numpy()
@@ -1,28 +1,19 @@
 from pathlib import Path
 
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from table_io import read_table
+from topic_model import load_topic_names
+
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 CSV_PATH = PROJECT_ROOT / "topic_clustered.csv"
 
-df = pd.read_csv(CSV_PATH)
+df = read_table(CSV_PATH, columns=["eid", "year", "cluster"])
 
 df["year"] = df["year"].astype(str)
 df["cluster"] = df["cluster"].astype(int)
 
-topic_names = {
-    0: "Biodiversity & Species Discovery",
-    1: "Catalysis & CO2 Conversion",
-    2: "Education & Social/Public Health",
-    3: "Materials Science & Adsorption",
-    4: "Cancer Biology & Drug Discovery",
-    5: "Biomedical Experiments & Genetics",
-    6: "Clinical Patient Studies",
-    7: "COVID-19 & Vaccine Research",
-    8: "Particle Physics (LHC)",
-    9: "Machine Learning & Modeling",
-}
+topic_names = load_topic_names()
 
 df["topic_name"] = df["cluster"].map(topic_names)
 
@@ -0,0 +1,142 @@
+"""Disk-backed cache of sentence embeddings, keyed by a hash of the text.
+
+SDG_Classified.ipynb embeds every paper title with Sentence-BERT. The
+vectors are kept per model name and checkpoint revision in
+embedding_cache/<model>@<revision>/:
+
+    vectors.f32  float32 unit vectors, one row of `dim` values per text
+                 (raw, read as a memory map)
+    hashes.npy   uint64 hash of the text of each row
+    meta.json    model, revision, dim and number of valid rows
+
+so a rerun only encodes texts that are not in the store yet:
+
+    model_dir = snapshot_download("sentence-transformers/all-MiniLM-L6-v2")
+    model = SentenceTransformer(model_dir)
+    store = EmbeddingStore("all-MiniLM-L6-v2", model_revision(model_dir))
+    rows = store.embed(titles, model.encode)
+    store.vectors[rows]   # cosine similarity is a dot product
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIR = Path(__file__).resolve().parent / "embedding_cache"
+
+
+def model_revision(model_dir) -> str:
+    """Revision of the model checkpoint in model_dir, for the cache key.
+
+    A Hugging Face hub snapshot (.../snapshots/<commit>/) is identified by
+    its commit, so a re-downloaded or updated checkpoint gets a new cache
+    while library upgrades keep it. Any other directory is identified by a
+    hash of its config.json and modules.json."""
+    model_dir = Path(model_dir).resolve()
+    if model_dir.parent.name == "snapshots":
+        return model_dir.name
+    h = hashlib.blake2b(digest_size=8)
+    for name in ("config.json", "modules.json"):
+        path = model_dir / name
+        if path.exists():
+            h.update(name.encode("utf-8") + b"\0" + path.read_bytes())
+    return "config-" + h.hexdigest()
+
+
+def text_hashes(texts) -> np.ndarray:
+    """64-bit BLAKE2b hash of each text, as uint64."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(t).encode("utf-8"), digest_size=8).digest(), "little")
+         for t in texts),
+        dtype=np.uint64,
+    )
+
+
+class EmbeddingStore:
+    """Append-only embedding store of one model revision."""
+
+    def __init__(self, model_name: str, model_revision: str, cache_dir: Path = CACHE_DIR):
+        key = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{model_name}@{model_revision}")
+        self.path = Path(cache_dir) / key
+        self.model_name = model_name
+        self.model_revision = str(model_revision)
+        self.dim = None
+        self.hashes = np.array([], dtype=np.uint64)
+        # texts of the last embed() call: distinct, found in the store, encoded
+        self.last_unique = self.last_hits = self.last_added = 0
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self.hashes = np.load(self.path / "hashes.npy")[:meta["count"]]
+        self._index()
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _index(self):
+        self._order = np.argsort(self.hashes, kind="stable")
+        self._sorted = self.hashes[self._order]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """All cached vectors, memory-mapped read-only."""
+        if not len(self):
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r",
+                         shape=(len(self), self.dim))
+
+    def lookup(self, hashes) -> np.ndarray:
+        """Row of each hash in the store, -1 if it is not cached."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(self):
+            return np.full(len(hashes), -1)
+        pos = np.minimum(np.searchsorted(self._sorted, hashes), len(self) - 1)
+        return np.where(self._sorted[pos] == hashes, self._order[pos], -1)
+
+    def add(self, hashes, vectors):
+        """Append rows for new hashes; vectors are stored L2-normalized."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        # rows past meta["count"] are leftovers of an interrupted write
+        with open(self.path / "vectors.f32", "ab") as f:
+            f.truncate(len(self) * self.dim * 4)
+            f.write(np.ascontiguousarray(vectors).tobytes())
+        self.hashes = np.concatenate([self.hashes, np.asarray(hashes, dtype=np.uint64)])
+        np.save(self.path / "hashes.tmp.npy", self.hashes)
+        os.replace(self.path / "hashes.tmp.npy", self.path / "hashes.npy")
+        meta = {"model": self.model_name, "revision": self.model_revision,
+                "dim": self.dim, "count": len(self.hashes)}
+        with open(self.path / "meta.tmp.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(self.path / "meta.tmp.json", self.path / "meta.json")
+        self._index()
+
+    def embed(self, texts, encode, chunk_size: int = 4096) -> np.ndarray:
+        """Rows of `texts` in the store, encoding the missing ones first.
+
+        `encode` maps a list of strings to an array of vectors, e.g.
+        model.encode. New texts are saved every `chunk_size` texts, so an
+        interrupted run keeps what it has already embedded."""
+        texts = [str(t) for t in texts]
+        hashes = text_hashes(texts)
+        missing = self.lookup(hashes) < 0
+        new_hashes, first = np.unique(hashes[missing], return_index=True)
+        new_texts = [texts[i] for i in np.flatnonzero(missing)[first]]
+        for start in range(0, len(new_texts), chunk_size):
+            batch = new_texts[start:start + chunk_size]
+            self.add(new_hashes[start:start + chunk_size], encode(batch))
+        self.last_unique = len(np.unique(hashes))
+        self.last_added = len(new_texts)
+        self.last_hits = self.last_unique - self.last_added
+        return self.lookup(hashes)
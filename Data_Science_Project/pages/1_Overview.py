@@ -1,33 +1,53 @@
+import sys
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "Scripts(Data_Preparation&Topic_Classification)"
 CSV_PATH = PROJECT_ROOT / "papers_all_years.csv"
 
+sys.path.insert(0, str(SCRIPTS_DIR))
+from link_tables import count_papers_by, have_link_tables
+from table_io import read_table, table_mtime
+
 st.title("Overview")
 
 @st.cache_data
-def load_data():
-    return pd.read_csv(CSV_PATH)
+def load_data(papers_mtime: float):
+    return read_table(
+        CSV_PATH,
+        columns=["year", "journal", "subject_areas_str", "countries_str"],
+    )
+
+
+@st.cache_data
+def load_counts(papers_mtime: float, use_link_tables: bool, _papers):
+    """Papers per subject and per country, from the link tables if current.
+
+    _papers is not hashed; papers_mtime identifies it in the cache key."""
+    if use_link_tables:
+        subjects = count_papers_by("paper_subjects", "dim_subjects", "subject_id", "subject")
+        countries = count_papers_by("paper_countries", "dim_countries", "country_id", "country")
+        return subjects, countries
+
+    def explode_counts(col):
+        return _papers[col].dropna().astype(str).str.split("; ").explode().value_counts()
+
+    return explode_counts("subject_areas_str"), explode_counts("countries_str")
 
-df = load_data()
+
+papers_mtime = table_mtime(CSV_PATH)
+df = load_data(papers_mtime)
+subject_totals, country_totals = load_counts(papers_mtime, have_link_tables(), df)
 
 st.markdown("### Key Figures")
 
 total_papers = len(df)
-years = sorted(df["year"].unique())
+years = sorted(df["year"].dropna().unique())
 year_range = f"{years[0]}–{years[-1]}"
 num_journals = df["journal"].nunique()
-countries = (
-    df["countries_str"]
-    .dropna()
-    .str.split("; ")
-    .explode()
-    .unique()
-)
-num_countries = len(countries)
+num_countries = len(country_totals)
 
 col1, col2, col3 = st.columns(3)
 col1.metric("Total Papers", f"{total_papers:,}", year_range)
@@ -50,14 +70,7 @@ st.pyplot(fig)
 st.markdown("---")
 st.markdown("### Publication Share by Subject Area")
 
-subjects = (
-    df["subject_areas_str"]
-    .dropna()
-    .str.split("; ")
-    .explode()
-)
-
-subject_counts = subjects.value_counts().head(10)
+subject_counts = subject_totals.head(10)
 labels = subject_counts.index
 sizes = subject_counts.values
 
@@ -92,14 +105,7 @@ st.pyplot(fig3)
 st.markdown("---")
 st.markdown("### Top 15 Affiliation Countries")
 
-countries_series = (
-    df["countries_str"]
-    .dropna()
-    .str.split("; ")
-    .explode()
-)
-
-country_counts = countries_series.value_counts().head(15)
+country_counts = country_totals.head(15)
 
 fig4, ax4 = plt.subplots(figsize=(6, 5))
 country_counts.sort_values().plot(kind="barh", ax=ax4)
@@ -1,33 +1,29 @@
+import sys
 import streamlit as st
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "Scripts(Data_Preparation&Topic_Classification)"
 CLUSTER_PATH = PROJECT_ROOT / "topic_clustered.csv"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+from search_index import INDEX_DIR, EidLookup, SearchIndex
+from similar_papers import INDEX_DIR as SIMILAR_DIR, SimilarPapers
+from table_io import read_table, table_mtime
+from topic_model import load_topic_names
 TRENDS_PATH = PROJECT_ROOT / "topic_trends.csv"
 
 st.title("Topics")
 
 
 @st.cache_data
-def load_cluster():
-    df = pd.read_csv(CLUSTER_PATH)
+def load_cluster(cluster_mtime: float, topic_names: dict):
+    df = read_table(CLUSTER_PATH, columns=["eid", "year", "title", "cluster"])
     df["year"] = df["year"].astype(str)
-    topic_names = {
-        0: "Biodiversity & Species Discovery",
-        1: "Catalysis & CO2 Conversion",
-        2: "Education & Social/Public Health",
-        3: "Materials Science & Adsorption",
-        4: "Cancer Biology & Drug Discovery",
-        5: "Biomedical Experiments & Genetics",
-        6: "Clinical Patient Studies",
-        7: "COVID-19 & Vaccine Research",
-        8: "Particle Physics (LHC)",
-        9: "Machine Learning & Modeling",
-    }
-    if "topic_name" not in df.columns:
-        df["topic_name"] = df["cluster"].map(topic_names)
+    df["topic_name"] = df["cluster"].map(topic_names)
     return df
 
 
@@ -36,7 +32,21 @@ def load_trends():
     return pd.read_csv(TRENDS_PATH, index_col="year")
 
 
-df = load_cluster()
+@st.cache_resource
+def load_search_index(meta_mtime: float):
+    return SearchIndex.load(INDEX_DIR)
+
+
+@st.cache_resource
+def load_similar_index(meta_mtime: float, cluster_mtime: float):
+    index = SimilarPapers.load(SIMILAR_DIR)
+    cluster_eids = read_table(CLUSTER_PATH, columns=["eid"])["eid"]
+    # row of each indexed paper in the cluster table, -1 if it is not there
+    return index, EidLookup(cluster_eids).positions(index.eids)
+
+
+cluster_mtime = table_mtime(CLUSTER_PATH)
+df = load_cluster(cluster_mtime, load_topic_names())
 trends = load_trends()
 
 st.subheader("Topic Sizes")
@@ -61,10 +71,15 @@ st.pyplot(fig)
 st.markdown("---")
 st.subheader("Topic Explorer")
 
-topic_list = sorted(df["topic_name"].dropna().unique())
+topic_list = ["All topics"] + sorted(df["topic_name"].dropna().unique())
 selected_topic = st.selectbox("Select topic", topic_list)
 
-topic_df = df[df["topic_name"] == selected_topic][["year", "title"]]
+query = st.text_input("Search titles and abstracts", placeholder="e.g. graph neural network")
+
+if selected_topic == "All topics":
+    topic_df = df[["eid", "year", "title"]]
+else:
+    topic_df = df[df["topic_name"] == selected_topic][["eid", "year", "title"]]
 
 year_options = ["All years"] + sorted(topic_df["year"].unique(), reverse=True)
 selected_year = st.selectbox("Filter by year", year_options)
@@ -72,8 +87,52 @@ selected_year = st.selectbox("Filter by year", year_options)
 if selected_year != "All years":
     topic_df = topic_df[topic_df["year"] == selected_year]
 
-topic_df = topic_df.sort_values(["year", "title"], ascending=[False, True]).reset_index(drop=True)
+if query.strip() and (INDEX_DIR / "meta.json").exists():
+    index = load_search_index((INDEX_DIR / "meta.json").stat().st_mtime)
+    positions = index.lookup.positions(topic_df["eid"])
+    found = positions >= 0
+    row_of_doc = np.full(index.n_docs, -1)
+    row_of_doc[positions[found]] = np.flatnonzero(found)
+    docs, scores = index.search(query, k=200, mask=row_of_doc >= 0)
+    topic_df = topic_df.iloc[row_of_doc[docs]][["eid", "year", "title"]].assign(score=scores)
+    st.caption(f"{len(topic_df)} best matches, ranked by BM25 score")
+else:
+    if query.strip():
+        st.info("Search index not found; run search_index.py to enable search.")
+    topic_df = topic_df.sort_values(["year", "title"], ascending=[False, True])
 
-st.dataframe(topic_df, width="stretch", height=400)
+topic_df = topic_df.reset_index(drop=True)
 
-st.markdown("---")
\ No newline at end of file
+st.dataframe(topic_df.drop(columns="eid"), width="stretch", height=400)
+
+st.markdown("---")
+st.subheader("Similar Papers")
+
+if not (SIMILAR_DIR / "meta.json").exists():
+    st.info("Similar-papers index not found; run similar_papers.py to enable it.")
+elif topic_df.empty:
+    st.info("No papers in the explorer selection.")
+else:
+    similar_index, cluster_row = load_similar_index(
+        (SIMILAR_DIR / "meta.json").stat().st_mtime, cluster_mtime)
+    candidates = topic_df.head(500)
+    paper = st.selectbox(
+        "Paper from the explorer above", candidates.index,
+        format_func=lambda i: f"{candidates.at[i, 'year']} · {candidates.at[i, 'title']}",
+    )
+    k_max = similar_index.neighbors.shape[1]
+    if k_max > 5:
+        n_similar = st.slider("Number of similar papers", 5, k_max, min(10, k_max))
+    else:
+        n_similar = k_max
+    neighbors, similarity = similar_index.neighbors_of(candidates.at[paper, "eid"], k=n_similar)
+    rows = cluster_row[neighbors]
+    if len(neighbors) == 0:
+        st.info("This paper is not in the similar-papers index; rebuild it with similar_papers.py.")
+    else:
+        st.dataframe(
+            df.iloc[rows[rows >= 0]][["year", "title", "topic_name"]]
+            .assign(similarity=similarity[rows >= 0])
+            .reset_index(drop=True),
+            width="stretch",
+        )
\ No newline at end of file
@@ -1,85 +1,170 @@
+import hashlib
+import sys
 from pathlib import Path
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import networkx as nx
 from networkx.algorithms.community import greedy_modularity_communities
 from pyvis.network import Network
 
-st.title("Global Co-author Network (Top 100 Authors)")
+st.title("Global Co-author Network")
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "Scripts(Data_Preparation&Topic_Classification)"
 EDGES_PATH = PROJECT_ROOT / "author_top_edges.csv"
 DEG_PATH = PROJECT_ROOT / "author_degrees.csv"
+METRICS_PATH = PROJECT_ROOT / "author_metrics.csv"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+from author_graph import GRAPH_DIR, AuthorGraph, top_edges_per_author
+
+TOP_N = 100
+EDGES_PER_AUTHOR = 3
+METRICS = {"PageRank": "pagerank", "Betweenness": "betweenness", "Closeness": "closeness"}
+
+
+def file_digest(path: Path) -> str:
+    """Content hash of an input file, used as part of the cache keys."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def store_digest() -> str:
+    """Cache key for the graph store: its metadata plus array sizes/mtimes."""
+    h = hashlib.sha1((GRAPH_DIR / "meta.json").read_bytes())
+    for f in sorted(GRAPH_DIR.glob("*.npy")):
+        st_ = f.stat()
+        h.update(f"{f.name}:{st_.st_size}:{st_.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+@st.cache_resource
+def load_graph(digest: str) -> AuthorGraph:
+    return AuthorGraph.load(GRAPH_DIR)
 
 
 @st.cache_data
-def load_data():
+def load_data(edges_digest: str, deg_digest: str):
     deg = pd.read_csv(DEG_PATH)
     edges = pd.read_csv(EDGES_PATH)
+    if "weight" not in edges.columns:
+        edges["weight"] = 1
     return deg, edges
 
 
-deg_df, edges_df = load_data()
+@st.cache_data
+def load_metrics(metrics_digest: str) -> pd.DataFrame:
+    return pd.read_csv(METRICS_PATH).set_index("author_id")
+
+
+def keyed_by_id(edges: pd.DataFrame) -> pd.DataFrame:
+    """Graph store edges with author IDs as source/target; different authors
+    can share an indexed name, so names are only used as node labels."""
+    return (
+        edges.drop(columns=["source", "target"])
+        .rename(columns={"source_id": "source", "target_id": "target"})
+    )
+
+
+@st.cache_data(show_spinner="Querying graph...")
+def query_subgraph(digest: str, top_n: int, years, focus, depth: int,
+                   size_by=None, metrics_digest=None):
+    """Edges, node scores, groups and labels of the requested subgraph, from
+    the graph store, keyed by author ID.
+
+    Without a focus author: the top-N authors and their heaviest edges.
+    With one: the ego network up to `depth`, cut to the N strongest nodes.
+    Nodes are scored by their number of co-authors within the selected
+    years, unless `size_by` names a column of author_metrics.csv. Node groups are the
+    precomputed communities, if author_communities.py ran."""
+    g = load_graph(digest)
+    yr = None if tuple(years) == g.year_range() else tuple(years)
+    scores = g.degrees() if yr is None else g.year_degrees(yr)
+
+    if yr is None:
+        ego, subgraph_edges = g.ego, g.subgraph_edges
+    else:
+        ego = lambda a, d: g.year_ego(a, d, yr)
+        subgraph_edges = lambda ids: g.year_subgraph_edges(ids, yr)
+
+    if focus is None:
+        ids = g.top_k(top_n, years=yr)
+        edges = keyed_by_id(subgraph_edges(ids))
+        edges = top_edges_per_author(edges, ids, EDGES_PER_AUTHOR)
+    else:
+        ids = ego(focus, depth)
+        if len(ids) > top_n:
+            others = ids[ids != focus]
+            others = others[np.argsort(-scores[others], kind="stable")[:top_n - 1]]
+            ids = np.sort(np.append(others, focus))
+        edges = keyed_by_id(subgraph_edges(ids))
+
+    nodes = ids.tolist()
+    if size_by is None:
+        node_scores = dict(zip(nodes, np.asarray(scores[ids]).astype(int).tolist()))
+    else:
+        metric = load_metrics(metrics_digest)[size_by].reindex(ids).fillna(0)
+        node_scores = dict(zip(nodes, metric.tolist()))
+    node_groups = None
+    if g.community is not None:
+        node_groups = dict(zip(nodes, np.asarray(g.community[ids]).tolist()))
+    node_labels = dict(zip(nodes, g.names[ids].tolist()))
+    return edges, node_scores, node_groups, node_labels
 
-if "weight" not in edges_df.columns:
-    edges_df["weight"] = 1
 
-deg_df = deg_df.sort_values("degree", ascending=False)
-top_authors = deg_df["author"].head(100).tolist()
-top_author_set = set(top_authors)
+@st.cache_data(show_spinner="Building network...")
+def network_html(edges: pd.DataFrame, node_scores: dict, score_label: str,
+                 node_groups=None, node_labels=None) -> str:
+    """Graph, communities and pyvis HTML for one edge list.
 
-edges_small = edges_df[
-    edges_df["source"].isin(top_author_set)
-    & edges_df["target"].isin(top_author_set)
-]
+    `node_groups` maps nodes to precomputed community IDs; without it the
+    communities of the displayed subgraph are detected here. `node_labels`
+    maps nodes to the author names shown on the graph. Cached on the
+    inputs, so reruns with the same selection reuse the generated HTML."""
+    G = nx.from_pandas_edgelist(edges, "source", "target", edge_attr="weight")
+    G.add_nodes_from(node_scores)
 
-top_edges_list = []
-for author in top_authors:
-    sub = edges_small[
-        (edges_small["source"] == author)
-        | (edges_small["target"] == author)
+    if node_groups is not None:
+        groups = pd.Series({n: node_groups.get(n, -1) for n in G.nodes()})
+        communities = [
+            set(members.index)
+            for _, members in sorted(groups.groupby(groups), key=lambda kv: -len(kv[1]))
+        ]
+    elif G.number_of_edges():
+        communities = list(greedy_modularity_communities(G))
+    else:
+        communities = []
+    palette = [
+        "#e41a1c", "#377eb8", "#4daf4a", "#984ea3",
+        "#ff7f00", "#ffff33", "#a65628", "#f781bf", "#999999"
     ]
-    sub = sub.sort_values("weight", ascending=False).head(3)
-    top_edges_list.append(sub)
-
-top_edges = pd.concat(top_edges_list).drop_duplicates()
-
-G = nx.Graph()
-for _, row in top_edges.iterrows():
-    G.add_edge(row["source"], row["target"], weight=row["weight"])
-
-communities = list(greedy_modularity_communities(G))
-palette = [
-    "#e41a1c", "#377eb8", "#4daf4a", "#984ea3",
-    "#ff7f00", "#ffff33", "#a65628", "#f781bf", "#999999"
-]
-node_comm = {}
-for i, comm in enumerate(communities):
-    for n in comm:
-        node_comm[n] = palette[i % len(palette)]
-
-deg_df_top = deg_df[deg_df["author"].isin(top_authors)].reset_index(drop=True)
-deg_df_top["rank"] = deg_df_top["degree"].rank(ascending=False, method="dense")
-rank_map = dict(zip(deg_df_top["author"], deg_df_top["rank"]))
-deg_map = dict(zip(deg_df_top["author"], deg_df_top["degree"]))
-max_rank = int(deg_df_top["rank"].max())
-
-
-def node_size(author: str) -> float:
-    r = int(rank_map.get(author, max_rank + 1))
-    return 10 + (max_rank + 1 - r) * 0.6
-
-
-net = Network(
-    height="800px",
-    width="100%",
-    bgcolor="#ffffff",
-    font_color="#111111"
-)
+    node_comm = {}
+    for i, comm in enumerate(communities):
+        for n in comm:
+            node_comm[n] = palette[i % len(palette)]
+
+    ranks = pd.Series(node_scores, dtype=float).rank(ascending=False, method="dense")
+    rank_map = ranks.to_dict()
+    max_rank = int(ranks.max()) if len(ranks) else 0
+
+    def node_size(author) -> float:
+        r = int(rank_map.get(author, max_rank + 1))
+        return 10 + (max_rank + 1 - r) * 0.6
+
+    net = Network(
+        height="800px",
+        width="100%",
+        bgcolor="#ffffff",
+        font_color="#111111"
+    )
 
-net.set_options(
-    """
+    net.set_options(
+        """
 {
   "nodes": {
     "font": {
@@ -111,35 +196,101 @@ net.set_options(
   }
 }
 """
-)
-
-for node in G.nodes():
-    size = node_size(node)
-    color = node_comm.get(node, "#bbbbbb")
-    degree = int(deg_map.get(node, 0))
-    title = f"{node}<br>Co-authors: {degree}"
-
-    net.add_node(
-        node,
-        label=node,
-        color=color,
-        size=size,
-        title=title
     )
 
-for u, v, data in G.edges(data=True):
-    w = int(data.get("weight", 1))
-    width = 1 + min(w, 4)
-    net.add_edge(u, v, width=width, title=f"{w} shared paper(s)")
+    for node in G.nodes():
+        size = node_size(node)
+        color = node_comm.get(node, "#bbbbbb")
+        score = node_scores.get(node, 0)
+        score_text = f"{score:.4g}" if isinstance(score, float) else f"{score}"
+        label = str((node_labels or {}).get(node, node))
+        title = f"{label}<br>{score_label}: {score_text}"
+
+        net.add_node(
+            node,
+            label=label,
+            color=color,
+            size=size,
+            title=title
+        )
+
+    for u, v, data in G.edges(data=True):
+        w = data.get("weight", 1)
+        width = 1 + min(w, 4)
+        w_text = f"{w:g}" if isinstance(w, float) else f"{w}"
+        net.add_edge(u, v, width=width, title=f"{w_text} shared paper(s)")
+
+    return net.generate_html()
+
+
+if (GRAPH_DIR / "meta.json").exists():
+    digest = store_digest()
+    graph = load_graph(digest)
+
+    col1, col2 = st.columns(2)
+    top_n = col1.slider("Number of authors (N)", 10, 300, TOP_N, step=10)
+    if graph.has_papers():
+        lo, hi = graph.year_range()
+        years = col2.slider("Year range", lo, hi, (lo, hi)) if lo < hi else (lo, hi)
+    else:
+        years = graph.year_range()
+
+    col3, col4 = st.columns([3, 1])
+    focus_name = col3.text_input(
+        "Focus author (indexed name, e.g. \"Smith J.\") - leave empty for the top-N network"
+    ).strip()
+    depth = col4.radio("Ego depth", [1, 2], horizontal=True)
+
+    full_range = tuple(years) == graph.year_range()
+    score_label = "Co-authors" if full_range else f"Co-authors {years[0]}-{years[1]}"
+    size_by, metrics_digest = None, None
+    if METRICS_PATH.exists() and METRICS_PATH.stat().st_mtime >= (GRAPH_DIR / "meta.json").stat().st_mtime:
+        size_label = st.radio("Size nodes by", [score_label, *METRICS], horizontal=True)
+        if size_label in METRICS:
+            score_label = f"{size_label} (all years)"
+            size_by, metrics_digest = METRICS[size_label], file_digest(METRICS_PATH)
+
+    focus = None
+    if focus_name:
+        if graph.ids_of(focus_name):
+            focus = graph.id_of(focus_name)
+        else:
+            st.warning(f"No author named {focus_name!r}; showing the top-N network.")
+
+    edges, node_scores, node_groups, node_labels = query_subgraph(
+        digest, top_n, tuple(years), focus, depth, size_by, metrics_digest)
+else:
+    st.info("Graph store not found (run coauthor_author_network.py); "
+            f"showing the precomputed top {TOP_N} authors.")
+    deg_df, edges_df = load_data(file_digest(EDGES_PATH), file_digest(DEG_PATH))
+    deg_df = deg_df.sort_values("degree", ascending=False).head(TOP_N)
+    # files from coauthor_author_network.py are keyed by author_id, older
+    # ones by name
+    key = "author_id" if "author_id" in deg_df.columns else "author"
+    top_authors = deg_df[key].tolist()
+    top_author_set = set(top_authors)
+    edges_small = edges_df[
+        edges_df["source"].isin(top_author_set)
+        & edges_df["target"].isin(top_author_set)
+    ]
+    edges = top_edges_per_author(edges_small, top_authors, EDGES_PER_AUTHOR)
+    node_scores = dict(zip(top_authors, deg_df["degree"].tolist()))
+    node_scores = {n: s for n, s in node_scores.items()
+                   if n in set(edges["source"]) | set(edges["target"])}
+    node_labels = dict(zip(top_authors, deg_df["author"].tolist()))
+    score_label = "Co-authors"
+    node_groups = None
 
-html = net.generate_html()
+html = network_html(edges, node_scores, score_label, node_groups, node_labels)
 
 st.write(
-    "Nodes are sized by number of collaborators. "
+    "Nodes are sized by number of collaborators "
+    "(co-authorship links within the years when a range is selected), "
+    "or by the selected centrality measure. "
     "Colors represent collaboration communities. "
     "Edges represent co-authorship, thickness = number of shared papers."
 )
 
 st.components.v1.html(html, height=800, scrolling=False)
 
-st.markdown("---")
\ No newline at end of file
+st.markdown("---")
@@ -1,12 +1,17 @@
+import sys
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "Scripts(Data_Preparation&Topic_Classification)"
 YEAR_PATH = PROJECT_ROOT / "ai_trends_year.csv"
 TOPIC_PATH = PROJECT_ROOT / "ai_trends_topic.csv"
 
+sys.path.insert(0, str(SCRIPTS_DIR))
+from ai_tags import TAG_DIR, KeywordTags
+
 st.title("AI-related Research Trends")
 
 @st.cache_data
@@ -17,6 +22,10 @@ def load_year():
 def load_topic():
     return pd.read_csv(TOPIC_PATH)
 
+@st.cache_resource
+def load_tags(meta_mtime: float):
+    return KeywordTags.load(TAG_DIR)
+
 df_year = load_year()
 df_topic = load_topic()
 
@@ -53,4 +62,54 @@ with col2:
     st.write("AI trends by topic")
     st.dataframe(df_topic_sorted)
 
+st.markdown("---")
+st.subheader("Explore AI Methods")
+
+if not (TAG_DIR / "meta.json").exists():
+    st.info("AI keyword tags not found; run ai_trends.py to enable this section.")
+else:
+    tags = load_tags((TAG_DIR / "meta.json").stat().st_mtime)
+    methods = st.multiselect("Methods", tags.methods, default=tags.methods)
+    years = None
+    if len(tags.year_values):
+        lo, hi = int(tags.year_values.min()), int(tags.year_values.max())
+        years = st.slider("Year range", lo, hi, (lo, hi)) if lo < hi else (lo, hi)
+        # the full range also keeps the papers of unknown year in the topic counts
+        years = None if years == (lo, hi) else years
+    topics = st.multiselect("Topics", tags.topic_names, default=tags.topic_names)
+    # likewise all topics keeps the papers without a topic (cluster -1) in the totals
+    topics = None if set(topics) == set(tags.topic_names) else topics
+
+    if not methods or topics == []:
+        st.info("Select at least one method and one topic.")
+    else:
+        by_year, by_topic = tags.counts(methods, years, topics)
+        col1, col2 = st.columns(2)
+        col1.metric("Papers mentioning the methods", int(by_year["ai_papers"].sum()))
+        col2.metric("Share of selected papers",
+                    f"{by_year['ai_papers'].sum() / max(by_year['total_papers'].sum(), 1):.1%}")
+
+        fig4, ax4 = plt.subplots()
+        ax4.plot(by_year["year"], by_year["ai_ratio"], marker="o")
+        ax4.set_xlabel("Year")
+        ax4.set_ylabel("Share of Papers")
+        st.pyplot(fig4)
+
+        by_method = tags.method_counts(methods, years, topics)
+        fig5, ax5 = plt.subplots(figsize=(8, 5))
+        for method in by_method.columns:
+            ax5.plot(by_method.index, by_method[method], marker="o", label=method)
+        ax5.set_xlabel("Year")
+        ax5.set_ylabel("Papers")
+        ax5.legend(fontsize=7, bbox_to_anchor=(1.05, 1), loc="upper left")
+        st.pyplot(fig5)
+
+        by_topic = by_topic.sort_values("ai_papers")
+        fig6, ax6 = plt.subplots(figsize=(8, 5))
+        ax6.barh(by_topic["topic_name"], by_topic["ai_papers"])
+        ax6.set_xlabel("Papers mentioning the methods")
+        st.pyplot(fig6)
+
+        st.dataframe(by_method)
+
 st.markdown("---")
\ No newline at end of file
@@ -1,3 +1,4 @@
+import sys
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -6,6 +7,10 @@ import plotly.express as px
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = PROJECT_ROOT / "Scripts(Data_Preparation&Topic_Classification)"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+from table_io import read_table
 
 # ==========================================
 # 0. Page Config
@@ -32,7 +37,7 @@ st.markdown("---")
 def load_resources():
     try:
         # โหลดข้อมูล
-        df = pd.read_csv('chula_papers_with_quality.csv')
+        df = read_table('chula_papers_with_quality.csv')
         df = df.dropna(subset=['SJR Best Quartile']) # กรองให้สะอาด
         
         # โหลดโมเดล
@@ -50,16 +55,15 @@ if df is None or model is None:
 
 # --- Data Preparation (เตรียมข้อมูลให้พร้อมใช้สำหรับทุกกราฟ) ---
 # 1. สร้างตัวแปร Collaboration Type
-def check_inter(country_str):
-    country_str = str(country_str)
-    if ';' in country_str: return 'International'
-    if 'Thailand' not in country_str: return 'International'
-    return 'Local (Thai Only)'
-
-df['Collaboration Type'] = df['countries_str'].apply(check_inter)
+# International = หลายประเทศ หรือไม่มี Thailand (vectorized แทน apply ทีละแถว)
+# ค่าว่าง (NaN) ไม่มี Thailand จึงนับเป็น International เหมือนเดิม
+countries = df['countries_str'].astype('string').fillna('')
+is_inter = countries.str.contains(';', regex=False) | ~countries.str.contains('Thailand', regex=False)
+df['Collaboration Type'] = np.where(is_inter, 'International', 'Local (Thai Only)')
 
 # 2. แยก Subject ตัวแรกออกมา (ใช้สำหรับกราฟ Subject ทั้งหมด)
-df['main_subject'] = df['subject_areas_str'].apply(lambda x: str(x).split(';')[0].strip())
+# ค่าว่าง (NaN) เป็น subject 'nan' เหมือน str(x) เดิม
+df['main_subject'] = df['subject_areas_str'].astype('string').fillna('nan').str.split(';', n=1).str[0].str.strip()
 
 # ==========================================
 # 2. Key Metrics (KPIs)
@@ -86,7 +90,7 @@ tab_trend1, tab_trend2 = st.tabs(["📅 Trend by Year", "🎓 Performance by Sub
 
 with tab_trend1:
     # กราฟเส้นแสดงจำนวน Q1 เทียบกับ Non-Q1 รายปี
-    trend_data = df.groupby(['year', 'SJR Best Quartile']).size().reset_index(name='count')
+    trend_data = df.groupby(['year', 'SJR Best Quartile'], observed=True).size().reset_index(name='count')
     # กรองเฉพาะปีที่มีข้อมูลสมบูรณ์ (2018-2023)
     trend_data = trend_data[(trend_data['year'] >= 2018) & (trend_data['year'] <= 2023)]
     
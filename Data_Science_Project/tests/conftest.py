@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "Scripts(SDG_Classification&Train_Q1_Models)"))
+sys.path.insert(0, str(PROJECT_ROOT / "Scripts(Data_Preparation&Topic_Classification)"))
@@ -0,0 +1,28 @@
+import json
+import os
+
+
+def scopus_doc(eid, title="A title", year="2020", abstract="An abstract."):
+    """Minimal Scopus abstracts-retrieval document."""
+    return {
+        "abstracts-retrieval-response": {
+            "coredata": {
+                "eid": eid,
+                "dc:title": title,
+                "prism:coverDate": f"{year}-01-15",
+                "prism:publicationName": "Journal",
+                "citedby-count": "3",
+                "dc:description": abstract,
+            },
+            "authors": {"author": [{"ce:indexed-name": "Smith J.", "@auid": "1"}]},
+            "subject-areas": {"subject-area": [{"$": "Engineering"}]},
+            "affiliation": {"affiliation-country": "Thailand"},
+        }
+    }
+
+
+def write_doc(path, eid, mtime_ns=None, **fields):
+    path.write_text(json.dumps(scopus_doc(eid, **fields)), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
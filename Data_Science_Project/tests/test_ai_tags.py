@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from ai_tags import KeywordTags, keyword_matrix
+
+KEYWORDS = ["machine learning", "deep learning", "neural network", "cnn ", " cnn",
+            "lstm", "bert", "transformer", "svm", "random forest"]
+
+
+def naive_matrix(texts, keywords):
+    return np.array([[k in t for k in keywords] for t in texts], dtype=bool).reshape(
+        len(texts), len(keywords))
+
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    words = ["the", "model", "cnn", "lstm", "bert", "robert", "transformers", "svm",
+             "deep", "learning", "machine", "neural", "network", "random", "forest",
+             "é", "ข้อมูล", "–", ""]
+    return [" ".join(rng.choices(words, k=rng.randint(0, 40))) for _ in range(n)]
+
+
+@pytest.mark.parametrize("chunk_size", [1 << 24, 64, 7])
+def test_matches_naive_substring_search(chunk_size):
+    texts = random_texts(500) + ["cnn at the start", "ends with cnn", "xcnnx", "bert"]
+    matrix = keyword_matrix(texts, KEYWORDS, chunk_size=chunk_size)
+    assert matrix.shape == (len(texts), len(KEYWORDS))
+    np.testing.assert_array_equal(matrix.toarray(), naive_matrix(texts, KEYWORDS))
+
+
+def test_non_string_texts_are_matched_as_str():
+    texts = [float("nan"), None, 2023, "svm"]
+    np.testing.assert_array_equal(keyword_matrix(texts, ["nan", "None", "svm"]).toarray(),
+                                  naive_matrix([str(t) for t in texts], ["nan", "None", "svm"]))
+
+
+@pytest.mark.parametrize("texts", [[], [""], ["", "", ""], ["a"]])
+def test_empty_corpus_is_all_false(texts):
+    matrix = keyword_matrix(texts, KEYWORDS)
+    assert matrix.shape == (len(texts), len(KEYWORDS))
+    assert matrix.dtype == bool
+    assert matrix.nnz == 0
+
+
+def test_nul_characters_do_not_split_texts():
+    texts = ["deep\x00learning", "svm", "\x00\x00", "bert\x00"]
+    matrix = keyword_matrix(texts, ["deeplearning", "svm", "bert"]).toarray()
+    np.testing.assert_array_equal(matrix, naive_matrix([t.replace("\x00", "") for t in texts],
+                                                       ["deeplearning", "svm", "bert"]))
+
+
+def test_rejects_short_keywords():
+    with pytest.raises(ValueError):
+        keyword_matrix(["a b"], ["a"])
+
+
+def test_unknown_years_only_dropped_when_a_range_is_selected():
+    matrix = sparse.csr_matrix(np.array([[1], [1], [0], [1]], dtype=bool))
+    tags = KeywordTags(matrix, np.array([2020, -1, 2021, 2021]), np.array([0, 0, 1, -1]),
+                       {"keywords": ["svm"], "methods": ["svm"], "topics": ["A", "B"]})
+
+    by_year, by_topic = tags.counts()
+    assert by_year["total_papers"].tolist() == [1, 2]
+    assert by_topic["total_papers"].tolist() == [2, 1]
+    assert by_topic["ai_papers"].tolist() == [2, 0]
+
+    by_year, by_topic = tags.counts(years=(2020, 2021))
+    assert by_year["total_papers"].tolist() == [1, 2]
+    assert by_topic["total_papers"].tolist() == [1, 1]
@@ -0,0 +1,74 @@
+from collections import defaultdict
+from itertools import combinations
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+from networkx.algorithms.community import modularity as nx_modularity
+
+from author_communities import best_labels, label_propagation, modularity, renumber_by_size
+from author_graph import AuthorGraph, save_graph
+
+
+def store_from_edges(tmp_path, n, edges):
+    src, dst, weight = (np.array(col) for col in zip(*edges))
+    authors = pd.DataFrame({"author_id": range(n), "name": [f"A{i}" for i in range(n)],
+                            "auid": None})
+    save_graph(src, dst, weight.astype(float), authors, tmp_path)
+    return AuthorGraph.load(tmp_path)
+
+
+def random_store(tmp_path, n=30, seed=0):
+    rng = np.random.default_rng(seed)
+    pairs = sorted({tuple(sorted(p)) for p in rng.integers(0, n, size=(70, 2)) if p[0] != p[1]})
+    return store_from_edges(tmp_path, n, [(a, b, int(rng.integers(1, 4))) for a, b in pairs])
+
+
+def naive_best_label(g, labels, a):
+    score = defaultdict(float)
+    ids, weights = g.neighbors(a)
+    for b, w in zip(ids, weights):
+        score[labels[b]] += w
+    if not score:
+        return labels[a]
+    best = max(score.values())
+    candidates = [lab for lab, s in score.items() if s == best]
+    return labels[a] if labels[a] in candidates else min(candidates)
+
+
+def test_best_labels_match_a_per_author_vote(tmp_path):
+    g = random_store(tmp_path)
+    labels = np.random.default_rng(1).integers(0, 6, size=g.n_authors).astype(np.int32)
+
+    got = best_labels(g.indptr, g.indices, g.weights, labels, 0, g.n_authors)
+    assert got.tolist() == [naive_best_label(g, labels, a) for a in range(g.n_authors)]
+    # any row range gives the same labels as the full pass
+    assert best_labels(g.indptr, g.indices, g.weights, labels, 7, 19).tolist() == got[7:19].tolist()
+
+
+def test_modularity_matches_networkx(tmp_path):
+    g = random_store(tmp_path)
+    community = np.random.default_rng(2).integers(0, 4, size=g.n_authors)
+
+    G = nx.Graph()
+    G.add_nodes_from(range(g.n_authors))
+    for a in range(g.n_authors):
+        for b, w in zip(*g.neighbors(a)):
+            G.add_edge(a, int(b), weight=float(w))
+    parts = [set(np.flatnonzero(community == c).tolist()) for c in np.unique(community)]
+    assert np.isclose(modularity(g, community), nx_modularity(G, parts, weight="weight"))
+
+
+def test_label_propagation_finds_planted_cliques(tmp_path):
+    cliques = [range(0, 6), range(6, 10), range(10, 18)]
+    edges = [(a, b, 3) for members in cliques for a, b in combinations(members, 2)]
+    edges += [(5, 6, 1), (9, 10, 1)]
+    g = store_from_edges(tmp_path, 19, edges)
+
+    labels = label_propagation(g, workers=1, graph_dir=tmp_path)
+    community, sizes = renumber_by_size(labels)
+
+    assert sizes.tolist() == [8, 6, 4, 1]
+    for c, members in zip([1, 2, 0], cliques):
+        assert (community[list(members)] == c).all()
+    assert community[18] == 3
@@ -0,0 +1,120 @@
+from itertools import combinations
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from author_graph import AuthorGraph, save_graph, top_edges_per_author
+from coauthor_author_network import coauthor_edges, paper_author_incidence
+
+N_AUTHORS = 40
+YEARS = np.arange(2018, 2024)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A random CSR store and the paper memberships it was built from."""
+    rng = np.random.default_rng(0)
+    papers = [sorted(set(rng.integers(0, N_AUTHORS, size=rng.integers(1, 6)).tolist()))
+              for _ in range(80)]
+    paper_year = rng.choice(YEARS, size=len(papers))
+    paper_authors = pd.DataFrame([(p, a) for p, members in enumerate(papers) for a in members],
+                                 columns=["paper_id", "author_id"])
+    incidence = paper_author_incidence(paper_authors, len(papers), N_AUTHORS)
+    src, dst, weight, _, paper_weight = coauthor_edges(incidence)
+    authors = pd.DataFrame({"author_id": range(N_AUTHORS),
+                            "name": [f"Author {i % 30}" for i in range(N_AUTHORS)],
+                            "auid": None})
+    save_graph(src, dst, weight, authors, tmp_path, incidence=incidence,
+               paper_year=paper_year, paper_weight=paper_weight, n_papers=len(papers))
+    return AuthorGraph.load(tmp_path), papers, paper_year
+
+
+def reference_graph(papers, paper_year=None, years=None):
+    G = nx.Graph()
+    G.add_nodes_from(range(N_AUTHORS))
+    for p, members in enumerate(papers):
+        if years is not None and not years[0] <= paper_year[p] <= years[1]:
+            continue
+        for a, b in combinations(members, 2):
+            w = G.edges[a, b]["weight"] + 1 if G.has_edge(a, b) else 1
+            G.add_edge(a, b, weight=w)
+    return G
+
+
+def test_neighbors_and_degrees_match_networkx(store):
+    g, papers, _ = store
+    G = reference_graph(papers)
+
+    assert g.degrees().tolist() == [G.degree(a) for a in range(N_AUTHORS)]
+    for a in range(N_AUTHORS):
+        ids, weights = g.neighbors(a)
+        assert ids.tolist() == sorted(G[a])
+        assert weights.tolist() == [G.edges[a, b]["weight"] for b in ids]
+
+    top = g.top_k_by_degree(5)
+    rest = np.setdiff1d(np.arange(N_AUTHORS), top)
+    assert g.degrees()[top].min() >= g.degrees()[rest].max()
+
+
+def test_names_resolve_to_the_best_connected_author(store):
+    g, papers, _ = store
+    G = reference_graph(papers)
+    assert g.ids_of("Author 3") == [3, 33]
+    assert g.id_of("Author 3") == max([3, 33], key=G.degree)
+    with pytest.raises(KeyError):
+        g.id_of("Nobody")
+
+
+def test_subgraph_and_ego_match_networkx(store):
+    g, papers, _ = store
+    G = reference_graph(papers)
+    a = int(g.top_k_by_degree(1)[0])
+
+    for depth in (1, 2):
+        expected = nx.single_source_shortest_path_length(G, a, cutoff=depth)
+        assert g.ego(a, depth).tolist() == sorted(expected)
+
+    ids = g.ego(a, 1)
+    edges = g.subgraph_edges(ids)
+    H = G.subgraph(ids.tolist())
+    got = {(s, t): w for s, t, w in zip(edges["source_id"], edges["target_id"], edges["weight"])}
+    assert got == {tuple(sorted(e)): d["weight"] for *e, d in H.edges(data=True)}
+
+def test_year_queries_count_only_papers_of_the_range(store):
+    g, papers, paper_year = store
+    years = (2019, 2021)
+    G = reference_graph(papers, paper_year, years)
+
+    assert g.year_degrees(years).tolist() == [G.degree(a) for a in range(N_AUTHORS)]
+    assert (g.year_degrees() == g.degrees()).all()
+
+    a = int(g.top_k(1, years)[0])
+    assert G.degree(a) == max(d for _, d in G.degree())
+    expected = nx.single_source_shortest_path_length(G, a, cutoff=2)
+    assert g.year_ego(a, 2, years).tolist() == sorted(expected)
+
+    edges = g.year_subgraph_edges(np.arange(N_AUTHORS), years)
+    got = {(s, t): w for s, t, w in zip(edges["source_id"], edges["target_id"], edges["weight"])}
+    assert got == {tuple(sorted(e)): d["weight"] for *e, d in G.edges(data=True)}
+
+
+@pytest.mark.parametrize("per_author", [1, 3])
+def test_top_edges_per_author_match_a_per_author_sort(per_author):
+    rng = np.random.default_rng(1)
+    pairs = sorted({tuple(sorted(p)) for p in rng.integers(0, 25, size=(150, 2)) if p[0] != p[1]})
+    edges = pd.DataFrame(pairs, columns=["source", "target"])
+    edges["weight"] = rng.integers(1, 4, size=len(edges))
+    authors = list(range(0, 25, 2))
+
+    rows = set()
+    for a in authors:
+        incident = edges[(edges["source"] == a) | (edges["target"] == a)]
+        rows |= set(incident.sort_values("weight", ascending=False, kind="stable")
+                    .head(per_author).index)
+    expected = edges.loc[sorted(rows)].reset_index(drop=True)
+
+    got = top_edges_per_author(edges, authors, per_author).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected)
+
@@ -0,0 +1,53 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pytest
+
+from author_graph import AuthorGraph, save_graph
+from author_metrics import pagerank, sampled_paths
+
+N_AUTHORS = 40
+
+
+@pytest.fixture
+def graph(tmp_path):
+    """A random weighted store (with isolated authors) and its networkx twin."""
+    rng = np.random.default_rng(0)
+    pairs = sorted({tuple(sorted(p)) for p in rng.integers(0, N_AUTHORS - 3, size=(70, 2))
+                    if p[0] != p[1]})
+    src, dst = np.array(pairs).T
+    weight = rng.integers(1, 5, size=len(src)).astype(float)
+    authors = pd.DataFrame({"author_id": range(N_AUTHORS), "name": [f"A{i}" for i in range(N_AUTHORS)],
+                            "auid": None})
+    save_graph(src, dst, weight, authors, tmp_path)
+
+    G = nx.Graph()
+    G.add_nodes_from(range(N_AUTHORS))
+    G.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()))
+    return AuthorGraph.load(tmp_path), G, tmp_path
+
+
+def as_array(values: dict):
+    return np.array([values[a] for a in range(N_AUTHORS)])
+
+
+def test_pagerank_matches_networkx(graph):
+    g, G, _ = graph
+    expected = as_array(nx.pagerank(G, weight="weight", tol=1e-12, max_iter=500))
+    assert np.allclose(pagerank(g), expected, atol=1e-8)
+
+
+@pytest.mark.parametrize("batch_size", [1, 8])
+def test_paths_from_every_source_are_exact(graph, batch_size):
+    g, G, graph_dir = graph
+    betweenness, closeness = sampled_paths(g, samples=N_AUTHORS, batch_size=batch_size,
+                                           workers=1, graph_dir=graph_dir)
+    assert np.allclose(betweenness, as_array(nx.betweenness_centrality(G)))
+    assert np.allclose(closeness, as_array(nx.closeness_centrality(G)))
+
+
+def test_sampled_betweenness_tracks_the_exact_ranking(graph):
+    g, G, graph_dir = graph
+    betweenness, _ = sampled_paths(g, samples=20, workers=1, graph_dir=graph_dir)
+    exact = as_array(nx.betweenness_centrality(G))
+    assert np.corrcoef(betweenness, exact)[0, 1] > 0.8
@@ -0,0 +1,76 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from author_years import YearGraphs, update_year_graphs
+from coauthor_author_network import paper_author_incidence
+
+PARAMS = {"hyper_policy": "clique", "max_authors": 100}
+
+
+def random_corpus(seed=0, n_papers=60, n_authors=25):
+    rng = np.random.default_rng(seed)
+    papers = [sorted(set(rng.integers(0, n_authors, size=rng.integers(1, 6)).tolist()))
+              for _ in range(n_papers)]
+    years = rng.integers(2018, 2022, size=n_papers)
+    authors = pd.DataFrame({
+        "author_id": range(n_authors),
+        "auid": [str(7000 + i) if i % 3 else None for i in range(n_authors)],
+        "name": [f"Author {i}" for i in range(n_authors)],
+    })
+    return papers, years, authors
+
+
+def build(papers, years, authors, out_dir):
+    paper_authors = pd.DataFrame([(p, a) for p, members in enumerate(papers) for a in members],
+                                 columns=["paper_id", "author_id"])
+    incidence = paper_author_incidence(paper_authors, len(papers), len(authors))
+    return update_year_graphs(incidence, years, np.ones(len(papers)),
+                              [f"2-s2.0-{p}" for p in range(len(papers))], authors,
+                              PARAMS, out_dir)
+
+
+def naive_edges(papers, years, authors, first, last):
+    """{(name, name): shared papers} over papers of first..last."""
+    names = authors["name"].tolist()
+    weights = Counter()
+    for members, year in zip(papers, years):
+        if first <= year <= last:
+            for a, b in combinations(members, 2):
+                weights[tuple(sorted((names[a], names[b])))] += 1
+    return weights
+
+
+def as_dict(edges):
+    return {tuple(sorted(p)): w for p, w in zip(zip(edges["source"], edges["target"]), edges["weight"])}
+
+
+def test_windows_sum_the_papers_of_their_years(tmp_path):
+    papers, years, authors = random_corpus()
+    assert build(papers, years, authors, tmp_path) == [2018, 2019, 2020, 2021]
+
+    yg = YearGraphs.load(tmp_path)
+    for first, last in [(2018, 2018), (2019, 2020), (2018, 2021)]:
+        assert as_dict(yg.edges(yg.window(first, last))) == naive_edges(papers, years, authors,
+                                                                         first, last)
+    assert as_dict(yg.edges(yg.cumulative(2019))) == naive_edges(papers, years, authors, 0, 2019)
+    assert yg.summary()["papers"].tolist() == np.bincount(years - 2018).tolist()
+
+
+def test_only_changed_years_are_rebuilt(tmp_path):
+    papers, years, authors = random_corpus()
+    build(papers, years, authors, tmp_path)
+    assert build(papers, years, authors, tmp_path) == []
+
+    # a new author on a 2020 paper: only 2020 is rebuilt, the index grows
+    authors = pd.concat([authors, pd.DataFrame({"author_id": [25], "auid": ["9999"],
+                                                "name": ["Newcomer"]})], ignore_index=True)
+    p = int(np.flatnonzero(years == 2020)[0])
+    papers[p] = papers[p] + [25]
+    assert build(papers, years, authors, tmp_path) == [2020]
+
+    yg = YearGraphs.load(tmp_path)
+    assert yg.index["key"].tolist()[-1] == "9999"
+    assert as_dict(yg.edges(yg.window())) == naive_edges(papers, years, authors, 0, 9999)
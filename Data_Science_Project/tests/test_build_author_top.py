@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from build_author_top import author_top
+
+
+def random_edges(seed=0, n_authors=30, n_edges=120):
+    rng = np.random.default_rng(seed)
+    pairs = {tuple(sorted(p)) for p in rng.integers(0, n_authors, size=(n_edges, 2)) if p[0] != p[1]}
+    src, dst = np.array(sorted(pairs)).T
+    return pd.DataFrame({
+        "source": src,
+        "target": dst,
+        "weight": rng.integers(1, 5, size=len(src)),
+        "source_name": [f"Author {a}" for a in src],
+        "target_name": [f"Author {b}" for b in dst],
+    })
+
+
+@pytest.mark.parametrize("chunksize", [7, 1000])
+def test_degrees_and_top_edges_match_a_full_table_scan(tmp_path, chunksize):
+    edges = random_edges()
+    path = tmp_path / "author_edges.csv"
+    edges.to_csv(path, index=False)
+
+    deg_df, top_edges, top_nodes = author_top(path, top_n=5, chunksize=chunksize)
+
+    degree = pd.concat([edges["source"], edges["target"]]).value_counts()
+    assert deg_df.set_index("author_id")["degree"].to_dict() == degree.to_dict()
+    assert (deg_df["author"] == "Author " + deg_df["author_id"].astype(str)).all()
+    assert deg_df["degree"].is_monotonic_decreasing
+
+    top = set(top_nodes["node"])
+    assert len(top) == 5
+    assert degree[list(top)].min() >= degree.drop(list(top)).max()
+    expected = edges[edges["source"].isin(top) | edges["target"].isin(top)]
+    pd.testing.assert_frame_equal(top_edges.reset_index(drop=True), expected.reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_name_keyed_edge_files_are_still_read(tmp_path):
+    edges = random_edges(seed=1)[["source_name", "target_name", "weight"]]
+    edges.columns = ["source", "target", "weight"]
+    path = tmp_path / "author_edges.csv"
+    edges.to_csv(path, index=False)
+
+    deg_df, _, _ = author_top(path, top_n=3, chunksize=10)
+
+    degree = pd.concat([edges["source"], edges["target"]]).value_counts()
+    assert "author_id" not in deg_df.columns
+    assert deg_df.set_index("author")["degree"].to_dict() == degree.to_dict()
@@ -0,0 +1,71 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from coauthor_author_network import coauthor_edges, paper_author_incidence
+
+
+def random_papers(seed=0, n_papers=60, n_authors=40, max_size=8):
+    """(paper_id, author_id, position) rows, some authors listed twice."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for p in range(n_papers):
+        members = rng.integers(0, n_authors, size=rng.integers(1, max_size + 1))
+        rows += [(p, int(a), i) for i, a in enumerate(members)]
+    return pd.DataFrame(rows, columns=["paper_id", "author_id", "position"]), n_papers, n_authors
+
+
+def naive_weights(paper_authors, paper_weight=lambda k: 1.0):
+    """{(a, b): summed weight} from explicit author pairs of every paper."""
+    weights = Counter()
+    for _, group in paper_authors.groupby("paper_id"):
+        members = sorted(set(group["author_id"]))
+        for a, b in combinations(members, 2):
+            weights[a, b] += paper_weight(len(members))
+    return weights
+
+
+def as_dict(src, dst, weight):
+    return {(int(a), int(b)): float(w) for a, b, w in zip(src, dst, weight)}
+
+
+def test_weights_match_explicit_pair_counts():
+    paper_authors, n_papers, n_authors = random_papers()
+    incidence = paper_author_incidence(paper_authors, n_papers, n_authors)
+    src, dst, weight, _, _ = coauthor_edges(incidence, max_authors=n_authors)
+
+    assert (src < dst).all()
+    assert as_dict(src, dst, weight) == naive_weights(paper_authors)
+
+
+def test_min_weight_drops_light_edges():
+    paper_authors, n_papers, n_authors = random_papers(seed=1, n_authors=15)
+    incidence = paper_author_incidence(paper_authors, n_papers, n_authors)
+    src, dst, weight, _, _ = coauthor_edges(incidence, max_authors=n_authors, min_weight=2)
+
+    expected = {pair: w for pair, w in naive_weights(paper_authors).items() if w >= 2}
+    assert as_dict(src, dst, weight) == expected
+
+
+@pytest.mark.parametrize("policy, weight_of_size", [
+    ("clique", lambda k: 1.0),
+    ("cap", lambda k: 0.0 if k > 5 else 1.0),
+    ("bipartite", lambda k: 0.0 if k > 5 else 1.0),
+    ("downweight", lambda k: 1 / (k - 1) if k > 5 else 1.0),
+])
+def test_hyper_policies_reweight_large_papers(policy, weight_of_size):
+    paper_authors, n_papers, n_authors = random_papers(seed=2, max_size=12)
+    incidence = paper_author_incidence(paper_authors, n_papers, n_authors)
+    src, dst, weight, hyper, paper_weight = coauthor_edges(incidence, policy, max_authors=5)
+
+    sizes = paper_authors.drop_duplicates(["paper_id", "author_id"]).groupby("paper_id").size()
+    assert (hyper == (sizes.to_numpy() > 5)).all()
+    assert np.allclose(paper_weight, [weight_of_size(k) for k in sizes])
+
+    expected = {pair: w for pair, w in naive_weights(paper_authors, weight_of_size).items() if w > 0}
+    got = as_dict(src, dst, weight)
+    assert got.keys() == expected.keys()
+    assert np.allclose([got[pair] for pair in expected], list(expected.values()))
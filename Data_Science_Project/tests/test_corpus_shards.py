@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+import corpus_shards
+from corpus_shards import ShardReader, is_current, iter_members, load_index, pack_year
+from scopus_docs import write_doc
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(corpus_shards, "DATA_ROOT", tmp_path / "Data")
+    monkeypatch.setattr(corpus_shards, "SHARD_ROOT", tmp_path / "Data" / "shards")
+    year_dir = tmp_path / "Data" / "2020"
+    year_dir.mkdir(parents=True)
+    for i in range(4):
+        write_doc(year_dir / f"paper{i}.json", f"2-s2.0-{i}", title="é" * i)
+    (year_dir / ".hidden").write_bytes(b"ignored")
+    return tmp_path / "Data"
+
+
+def test_pack_round_trip(data_root):
+    files = sorted((data_root / "2020").glob("*.json"))
+    assert pack_year("2020") == len(files)
+
+    index = load_index("2020")
+    assert list(index["name"]) == [f.name for f in files]
+    assert list(index["eid"]) == [f"2-s2.0-{i}" for i in range(4)]
+    assert list(iter_members("2020")) == [f.read_bytes() for f in files]
+    # a subset of members, read with seeks
+    assert list(iter_members("2020", index.iloc[[1, 3]])) == [files[1].read_bytes(),
+                                                             files[3].read_bytes()]
+
+    with ShardReader(["2020"]) as reader:
+        assert len(reader) == 4
+        assert reader.get_raw("2-s2.0-2") == files[2].read_bytes()
+        assert reader.get("2-s2.0-3")["abstracts-retrieval-response"]["coredata"]["dc:title"] == "ééé"
+
+
+def test_shard_goes_stale_when_the_files_change(data_root):
+    assert not is_current("2020")
+    pack_year("2020")
+    assert is_current("2020")
+
+    path = data_root / "2020" / "paper1.json"
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert not is_current("2020")
+    pack_year("2020")
+    assert is_current("2020")
+
+    write_doc(data_root / "2020" / "paper9.json", "2-s2.0-9")
+    assert not is_current("2020")
@@ -0,0 +1,100 @@
+import json
+
+import numpy as np
+
+from embedding_cache import EmbeddingStore, model_revision, text_hashes
+
+
+class CountingEncoder:
+    """Deterministic stand-in for model.encode that records its inputs."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(t), sum(map(ord, t)) % 97, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_text_hashes_are_stable_and_distinct():
+    hashes = text_hashes(["deep learning", "Deep learning", "deep learning"])
+    assert hashes.dtype == np.uint64
+    assert hashes[0] == hashes[2] != hashes[1]
+    np.testing.assert_array_equal(hashes, text_hashes(["deep learning", "Deep learning",
+                                                       "deep learning"]))
+
+
+def test_only_missing_texts_are_encoded(tmp_path):
+    encode = CountingEncoder()
+    store = EmbeddingStore("model", "rev1", tmp_path)
+    rows = store.embed(["a", "b", "a"], encode)
+    assert encode.calls == [["a", "b"]]
+    assert rows[0] == rows[2] != rows[1]
+    assert (store.last_unique, store.last_hits, store.last_added) == (2, 0, 2)
+
+    rows = store.embed(["b", "c", "a", "c"], encode)
+    assert encode.calls[-1] == ["c"]
+    assert (store.last_unique, store.last_hits, store.last_added) == (3, 2, 1)
+    assert len(store) == 3
+    np.testing.assert_allclose(np.linalg.norm(store.vectors[rows], axis=1), 1, rtol=1e-6)
+
+
+def test_vectors_survive_a_reload(tmp_path):
+    encode = CountingEncoder()
+    store = EmbeddingStore("model", "rev1", tmp_path)
+    first = store.embed(["a", "bb"], encode, chunk_size=1)
+    second = store.embed(["ccc"], encode)
+    before = np.array(store.vectors)
+
+    reloaded = EmbeddingStore("model", "rev1", tmp_path)
+    assert len(reloaded) == 3
+    assert isinstance(reloaded.vectors, np.memmap)
+    np.testing.assert_array_equal(reloaded.vectors, before)
+    rows = reloaded.embed(["ccc", "a"], encode)
+    assert reloaded.last_added == 0
+    np.testing.assert_array_equal(rows, [second[0], first[0]])
+
+
+def test_rows_of_an_interrupted_write_are_ignored(tmp_path):
+    encode = CountingEncoder()
+    store = EmbeddingStore("model", "rev1", tmp_path)
+    store.embed(["a"], encode)
+    # a row written after the last committed meta.json
+    with open(store.path / "vectors.f32", "ab") as f:
+        f.write(np.ones(3, dtype=np.float32).tobytes())
+
+    reloaded = EmbeddingStore("model", "rev1", tmp_path)
+    assert len(reloaded) == 1
+    reloaded.embed(["b"], encode)
+    again = EmbeddingStore("model", "rev1", tmp_path)
+    assert len(again) == 2
+    assert (store.path / "vectors.f32").stat().st_size == 2 * 3 * 4
+    np.testing.assert_array_equal(again.vectors[0], store.vectors[0])
+    np.testing.assert_array_equal(again.vectors[1], reloaded.vectors[1])
+
+
+def test_a_new_revision_starts_an_empty_cache(tmp_path):
+    encode = CountingEncoder()
+    EmbeddingStore("model", "rev1", tmp_path).embed(["a", "b"], encode)
+    other = EmbeddingStore("model", "rev2", tmp_path)
+    assert len(other) == 0
+    other.embed(["a"], encode)
+    assert encode.calls[-1] == ["a"]
+    with open(other.path / "meta.json", encoding="utf-8") as f:
+        assert json.load(f)["revision"] == "rev2"
+    assert len(EmbeddingStore("model", "rev1", tmp_path)) == 2
+
+
+def test_model_revision(tmp_path):
+    snapshot = tmp_path / "models--org--model" / "snapshots" / "0123abcd"
+    snapshot.mkdir(parents=True)
+    assert model_revision(snapshot) == "0123abcd"
+
+    local = tmp_path / "local_model"
+    local.mkdir()
+    (local / "config.json").write_text('{"hidden_size": 384}')
+    (local / "modules.json").write_text("[]")
+    first = model_revision(local)
+    assert first == model_revision(local)
+    (local / "config.json").write_text('{"hidden_size": 768}')
+    assert model_revision(local) != first
@@ -0,0 +1,121 @@
+import pytest
+
+import build_papers_csv
+import corpus_shards
+from build_papers_csv import (
+    iter_records,
+    load_manifest,
+    load_record_cache,
+    manifest_key,
+    save_manifest,
+    save_record_cache,
+    update_manifest,
+)
+from corpus_shards import pack_year
+from scopus_docs import write_doc
+
+
+def year_files(root, n=3):
+    year_dir = root / "Data" / "2020"
+    year_dir.mkdir(parents=True)
+    return [write_doc(year_dir / f"paper{i}.json", f"2-s2.0-{i}", mtime_ns=10 ** 18)
+            for i in range(n)]
+
+
+def test_only_added_or_modified_files_are_rescanned(tmp_path):
+    files = year_files(tmp_path)
+    manifest = load_manifest(tmp_path / "manifest.pkl")
+    assert update_manifest(manifest, files)[:2] == (3, 3)
+    assert update_manifest(manifest, files) == (0, 0, {})
+
+    # same bytes with a new mtime: re-scanned but not new content
+    write_doc(files[0], "2-s2.0-0", mtime_ns=2 * 10 ** 18)
+    # modified content
+    write_doc(files[1], "2-s2.0-1", mtime_ns=2 * 10 ** 18, title="New title")
+    added = write_doc(files[0].with_name("paper9.json"), "2-s2.0-9")
+    n_scanned, n_changed, fresh = update_manifest(manifest, files + [added])
+    assert (n_scanned, n_changed) == (3, 2)
+    assert sorted(fresh) == ["paper0.json", "paper1.json", "paper9.json"]
+    assert fresh["paper1.json"]["title"] == "New title"
+
+
+def test_manifest_keeps_only_file_metadata(tmp_path):
+    manifest = load_manifest(tmp_path / "manifest.pkl")
+    update_manifest(manifest, year_files(tmp_path))
+    for entry in manifest["files"].values():
+        assert set(entry) == {"size", "mtime_ns", "sha1", "ok"}
+
+
+def test_manifest_round_trip(tmp_path):
+    files = year_files(tmp_path)
+    manifest = load_manifest(tmp_path / "manifest.pkl")
+    update_manifest(manifest, files)
+    save_manifest(manifest, tmp_path / "manifest.pkl")
+    reloaded = load_manifest(tmp_path / "manifest.pkl")
+    assert reloaded == manifest
+    assert update_manifest(reloaded, files) == (0, 0, {})
+
+
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_papers_csv, "DATA_ROOT", tmp_path / "Data")
+    monkeypatch.setattr(corpus_shards, "DATA_ROOT", tmp_path / "Data")
+    monkeypatch.setattr(corpus_shards, "SHARD_ROOT", tmp_path / "Data" / "shards")
+    monkeypatch.setattr(build_papers_csv, "RECORD_CACHE_DIR", tmp_path / "ingest_cache")
+    return tmp_path / "Data"
+
+
+def test_incremental_records_match_a_full_parse(tmp_path, data_root):
+    files = year_files(tmp_path)
+
+    def records(manifest):
+        return list(iter_records(["2020"], workers=1, manifest=manifest, source="files"))
+
+    manifest = load_manifest(tmp_path / "manifest.pkl")
+    full = records(None)
+    assert records(manifest) == full
+    assert [r["eid"] for r in full] == ["2-s2.0-0", "2-s2.0-1", "2-s2.0-2"]
+
+    # unchanged papers are read back from the record cache
+    assert records(manifest) == full
+    assert sorted(load_record_cache("2020")) == [f.name for f in files]
+
+    # a lost cache is rebuilt by parsing the files again
+    (tmp_path / "ingest_cache" / "2020.parquet").unlink()
+    assert records(manifest) == full
+
+    files[2].unlink()
+    assert records(manifest) == full[:2]
+    assert sorted(manifest["files"]) == [manifest_key("2020", f.name) for f in files[:2]]
+
+
+def test_record_cache_round_trip_keeps_missing_fields(tmp_path, data_root):
+    full = {"eid": "2-s2.0-1", "title": "T", "citedby_count": 3, "abstract": "A"}
+    sparse = {"eid": "2-s2.0-2", "title": None, "citedby_count": None, "abstract": None}
+    save_record_cache("2020", ["a.json", "b.json", "c.json"], [full, None, sparse])
+
+    cached = load_record_cache("2020")
+    assert sorted(cached) == ["a.json", "c.json"]
+    assert cached["a.json"]["citedby_count"] == 3
+    assert cached["c.json"]["title"] is None
+    assert cached["c.json"]["citedby_count"] is None
+    assert cached["c.json"]["doi"] is None
+
+
+def test_entries_survive_a_switch_between_shard_and_file_mode(tmp_path, data_root, capsys):
+    files = year_files(tmp_path)
+    full = list(iter_records(["2020"], workers=1, source="files"))
+    pack_year("2020")
+
+    manifest = load_manifest(tmp_path / "manifest.pkl")
+    assert list(iter_records(["2020"], workers=1, manifest=manifest, source="auto")) == full
+    assert "3 new or modified papers" in capsys.readouterr().out
+
+    # one added file makes the shard stale: only that file is parsed
+    added = write_doc(files[0].with_name("paper9.json"), "2-s2.0-9")
+    records = list(iter_records(["2020"], workers=1, manifest=manifest, source="auto"))
+    out = capsys.readouterr().out
+    assert "re-scanned 1 files, 1 new or modified" in out
+    assert "Dropped" not in out
+    assert records[:3] == full
+    assert records[3]["source_file"] == str(added)
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+import pytest
+
+import link_tables
+from link_tables import have_link_tables, read_link_table, write_link_tables
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(link_tables, "PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(link_tables, "PAPERS_PATH", tmp_path / "papers_all_years.csv")
+    monkeypatch.setattr(link_tables, "STAMP_PATH", tmp_path / "link_tables.json")
+    return tmp_path
+
+
+def write_papers(path, authors):
+    papers = pd.DataFrame({
+        "eid": [f"2-s2.0-{i}" for i in range(len(authors))],
+        "year": 2020,
+        "authors_str": authors,
+        "author_ids_str": None,
+        "subject_areas_str": "Medicine",
+        "countries_str": "Japan",
+    })
+    papers.to_csv(path, index=False)
+    return papers
+
+
+def test_tables_are_used_only_for_the_papers_file_they_were_built_from(project, capsys):
+    papers_path = project / "papers_all_years.csv"
+    assert not have_link_tables()
+
+    write_link_tables(write_papers(papers_path, ["A; B", "B; C"]))
+    assert have_link_tables()
+    assert len(read_link_table("paper_authors")) == 4
+
+    write_papers(papers_path, ["A; B", "B; C", "C; D"])
+    os.utime(papers_path, ns=(0, 10 ** 18))
+    assert not have_link_tables()
+    assert "run link_tables.py" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from search_index import EidLookup, SearchIndex, build_index, make_vectorizer
+
+TITLES = [
+    "Graph neural networks for molecules",
+    "Deep learning in medical imaging",
+    "Neural network pruning",
+    "Soil microbes and crop yield",
+    None,
+]
+ABSTRACTS = [
+    "We apply graph neural networks to predict molecular properties of graphs.",
+    "Convolutional networks segment tumours; deep learning beats radiologists.",
+    "Pruning removes weights from a trained neural network with little loss.",
+    "Field trials relate soil microbial diversity to wheat yield.",
+    "A neural approach to crop yield forecasting from satellite images.",
+]
+
+
+def naive_bm25(query, k1=1.2, b=0.75, title_weight=2.0):
+    """BM25 scores computed term by term from token counts."""
+    analyze = make_vectorizer().build_analyzer()
+    docs = []
+    for title, abstract in zip(TITLES, ABSTRACTS):
+        tf = Counter(analyze(abstract))
+        for term in analyze(title or ""):
+            tf[term] += title_weight
+        docs.append(tf)
+    avg_len = sum(sum(tf.values()) for tf in docs) / len(docs)
+    scores = []
+    for tf in docs:
+        doc_len = sum(tf.values())
+        score = 0.0
+        for term in set(analyze(query)):
+            df = sum(term in d for d in docs)
+            if df == 0 or term not in tf:
+                continue
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * doc_len / avg_len))
+        scores.append(score)
+    return np.array(scores)
+
+
+@pytest.fixture
+def index(tmp_path):
+    eids = [f"2-s2.0-{i}" for i in range(len(TITLES))]
+    return SearchIndex.load(build_index(eids, TITLES, ABSTRACTS, out_dir=tmp_path))
+
+
+@pytest.mark.parametrize("query", ["neural network", "crop yield", "graph", "deep learning imaging",
+                                   "unknownword"])
+def test_scores_match_a_term_by_term_bm25(index, query):
+    assert np.allclose(index.scores(query), naive_bm25(query), rtol=1e-5)
+
+
+def test_search_ranks_matching_documents_within_the_mask(index):
+    expected = naive_bm25("neural network yield")
+    docs, scores = index.search("neural network yield", k=3)
+    assert docs.tolist() == list(np.argsort(-expected, kind="stable")[:3])
+    assert np.allclose(scores, expected[docs], rtol=1e-5)
+
+    mask = np.array([False, True, False, True, True])
+    docs, _ = index.search("neural network yield", k=10, mask=mask)
+    assert set(docs.tolist()) == {i for i in np.flatnonzero(mask) if expected[i] > 0}
+
+
+def test_eid_lookup_maps_repeats_to_their_first_position():
+    lookup = EidLookup(["a", "b", "a", "c"])
+    assert lookup.positions(["c", "a", "z", "b"]).tolist() == [3, 0, -1, 1]
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from similar_papers import SimilarPapers, build_index, top_k_blocked
+
+
+def unit_rows(n=50, dims=8, seed=0):
+    v = np.random.default_rng(seed).normal(size=(n, dims)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def brute_force(vectors, k):
+    """Full cosine matrix, self excluded, sorted best first."""
+    sim = vectors @ vectors.T
+    np.fill_diagonal(sim, -np.inf)
+    order = np.argsort(-sim, axis=1, kind="stable")[:, :k]
+    return order, np.take_along_axis(sim, order, axis=1)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1024])
+def test_blocked_neighbours_match_a_full_similarity_matrix(block_size):
+    vectors = unit_rows()
+    indices, scores = top_k_blocked(vectors, 5, block_size)
+    expected, expected_scores = brute_force(vectors, 5)
+    assert indices.tolist() == expected.tolist()
+    assert np.allclose(scores, expected_scores)
+
+
+def test_k_is_capped_by_the_number_of_other_papers():
+    indices, _ = top_k_blocked(unit_rows(n=4), 10)
+    assert indices.shape == (4, 3)
+    assert all(sorted(row) == sorted(set(range(4)) - {i}) for i, row in enumerate(indices.tolist()))
+    assert top_k_blocked(unit_rows(n=1), 10)[0].shape == (1, 0)
+
+
+def test_saved_index_answers_like_brute_force(tmp_path):
+    vectors = unit_rows() * 3  # build_index normalizes
+    eids = [f"2-s2.0-{i}" for i in range(len(vectors))]
+    index = SimilarPapers.load(build_index(vectors, eids, k=5, out_dir=tmp_path))
+    expected, expected_scores = brute_force(unit_rows(), 5)
+
+    rows, sims = index.neighbors_of("2-s2.0-7", k=3)
+    assert rows.tolist() == expected[7, :3].tolist()
+    assert np.allclose(sims, expected_scores[7, :3])
+    assert index.similar("2-s2.0-7", k=3)["eid"].tolist() == [eids[i] for i in expected[7, :3]]
+    assert len(index.neighbors_of("2-s2.0-missing")[0]) == 0
+
+    query = np.random.default_rng(1).normal(size=8)
+    sim = unit_rows() @ (query / np.linalg.norm(query))
+    found = index.query_vector(query, k=4)
+    assert found["eid"].tolist() == [eids[i] for i in np.argsort(-sim)[:4]]
+    assert np.allclose(found["similarity"], np.sort(sim)[::-1][:4], atol=1e-6)
+
+
+def test_text_queries_go_through_the_lsa_projection(tmp_path):
+    texts = ["graph neural networks for molecules", "neural networks for images",
+             "soil microbes and crop yield", "wheat yield under drought",
+             "graph algorithms for shortest paths", "deep neural image segmentation"]
+    vectorizer = TfidfVectorizer()
+    svd = TruncatedSVD(n_components=3, random_state=0)
+    vectors = svd.fit_transform(vectorizer.fit_transform(texts))
+    eids = [f"e{i}" for i in range(len(texts))]
+    index = SimilarPapers.load(build_index(vectors, eids, k=2, out_dir=tmp_path,
+                                           projection={"vectorizer": vectorizer, "svd": svd}))
+
+    query = svd.transform(vectorizer.transform(["crop yield"]))[0]
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sim = unit @ (query / np.linalg.norm(query))
+    assert index.query_text("crop yield", k=2)["eid"].tolist() == [eids[i] for i in np.argsort(-sim)[:2]]
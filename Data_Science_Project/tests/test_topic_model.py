@@ -0,0 +1,38 @@
+import numpy as np
+
+from topic_model import match_clusters, topic_names_for
+
+
+def test_permuted_clusters_keep_their_ids():
+    prev = np.array([0, 0, 1, 1, 2, 2])
+    new = np.array([2, 2, 0, 0, 1, 1])
+    ids = match_clusters(prev, new, 3)
+    np.testing.assert_array_equal(ids[new], prev)
+
+
+def test_majority_overlap_wins():
+    prev = np.array([0, 0, 0, 1, 1, 1, 1])
+    new = np.array([1, 1, 0, 0, 0, 0, 1])
+    ids = match_clusters(prev, new, 2)
+    np.testing.assert_array_equal(ids, [1, 0])
+
+
+def test_unmatched_clusters_never_reuse_a_previous_id():
+    # previous cluster 1 disappeared and new cluster 2 matches nothing;
+    # papers without a previous label are ignored
+    prev = np.array([0, 0, 1, 2, 2, -1])
+    new = np.array([1, 1, 1, 0, 0, 2])
+    ids = match_clusters(prev, new, 3)
+    assert ids[1] == 0 and ids[0] == 2
+    assert ids[2] == 3
+
+    names = topic_names_for({int(c): ["term"] for c in ids},
+                            {0: "Zero", 1: "Vanished", 2: "Two"})
+    assert names[0] == "Zero" and names[2] == "Two"
+    assert names[3] == "Topic 3: term"
+    assert "Vanished" not in names.values()
+
+
+def test_no_previous_labels_keeps_kmeans_order():
+    ids = match_clusters(np.full(5, -1), np.array([0, 1, 2, 1, 0]), 3)
+    np.testing.assert_array_equal(ids, [0, 1, 2])